@@ -10,8 +10,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
+from app.core.config import settings
 from app.db.session import Base
-from app.models import user, polls, vote, comment, like
+from app.db.migrations import LEGACY_REVISION, MIGRATION_LOCK_ID, is_legacy_schema
+from app.db.search import include_name
+from app.models import user, polls, vote, comment, like, poll_option, poll_option_count
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -19,9 +22,13 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped when the app runs migrations itself, so its logging is left alone
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
+# Migrate the database the app is configured for, not the .ini default
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
@@ -50,9 +57,37 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _upgrading() -> bool:
+    """Whether this run is `alembic upgrade` or the app's own upgrade_schema()."""
+    command = getattr(config.cmd_opts, "cmd", None)
+    if command is not None:
+        return command[0].__name__ == "upgrade"
+    return config.attributes.get("upgrading", False)
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata,
+        # The full-text search table is managed by hand, not from the models
+        include_name=include_name,
     )
 
     with context.begin_transaction():
+        if connection.dialect.name == "postgresql":
+            # Several replicas may run "upgrade head" at once; the first one
+            # migrates and the rest find the schema already at head
+            connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})")
+        if _upgrading() and is_legacy_schema(connection):
+            # A database create_all() built matches LEGACY_REVISION; record
+            # that so the upgrade converts it instead of recreating its tables
+            context.get_context().stamp(context.script, LEGACY_REVISION)
         context.run_migrations()
 
 
@@ -61,8 +96,15 @@ def run_migrations_online() -> None:
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
+    The app passes its own connection in config.attributes when it
+    migrates on startup.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -70,12 +112,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_migrations(connection)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,38 @@
+"""unique vote per user
+
+Revision ID: 0a6d4f3e8c27
+Revises: e57a1c9b3f02
+Create Date: 2025-11-10 09:05:51.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d4f3e8c27'
+down_revision: Union[str, Sequence[str], None] = 'e57a1c9b3f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the earliest vote of any duplicates left by the old check-then-insert race
+    op.execute(
+        "DELETE FROM votes WHERE id NOT IN ("
+        "SELECT MIN(id) FROM votes GROUP BY poll_id, user_id)"
+    )
+    op.execute("DELETE FROM poll_option_counts")
+    op.execute(
+        "INSERT INTO poll_option_counts (poll_id, option_id, vote_count) "
+        "SELECT poll_id, option_id, COUNT(*) FROM votes "
+        "WHERE poll_id IS NOT NULL GROUP BY poll_id, option_id"
+    )
+    op.create_index('ix_votes_poll_id_user_id', 'votes', ['poll_id', 'user_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_votes_poll_id_user_id', table_name='votes')
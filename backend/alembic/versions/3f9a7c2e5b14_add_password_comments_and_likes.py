@@ -0,0 +1,66 @@
+"""add password, comments and likes
+
+Revision ID: 3f9a7c2e5b14
+Revises: b81f4e6a2d59
+Create Date: 2025-11-16 09:27:44.018266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a7c2e5b14'
+down_revision: Union[str, Sequence[str], None] = 'b81f4e6a2d59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The initial revision missed these; databases that were built with
+# create_all() and stamped already have them, so each step is skipped if so
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if 'password' not in {column['name'] for column in inspector.get_columns('users')}:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.add_column(sa.Column('password', sa.String(), nullable=True))
+
+    if not inspector.has_table('comments'):
+        op.create_table('comments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('poll_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('content', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_comments_id'), 'comments', ['id'], unique=False)
+        op.create_index('ix_comments_poll_id_created_at_id', 'comments', ['poll_id', 'created_at', 'id'], unique=False)
+
+    if not inspector.has_table('likes'):
+        op.create_table('likes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('poll_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('poll_id', 'user_id', name='unique_poll_user_like')
+        )
+        op.create_index(op.f('ix_likes_id'), 'likes', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_likes_id'), table_name='likes')
+    op.drop_table('likes')
+    op.drop_index('ix_comments_poll_id_created_at_id', table_name='comments')
+    op.drop_index(op.f('ix_comments_id'), table_name='comments')
+    op.drop_table('comments')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('password')
@@ -0,0 +1,40 @@
+"""add poll option counts
+
+Revision ID: 4b1e7c2a9d10
+Revises: dd20dd3b5f85
+Create Date: 2025-11-02 10:14:22.512031
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e7c2a9d10'
+down_revision: Union[str, Sequence[str], None] = 'dd20dd3b5f85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('poll_option_counts',
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('option', sa.String(), nullable=False),
+    sa.Column('vote_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+    sa.PrimaryKeyConstraint('poll_id', 'option')
+    )
+    # Backfill tallies from existing votes
+    op.execute(
+        "INSERT INTO poll_option_counts (poll_id, option, vote_count) "
+        "SELECT poll_id, option, COUNT(*) FROM votes "
+        "WHERE poll_id IS NOT NULL GROUP BY poll_id, option"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('poll_option_counts')
@@ -0,0 +1,36 @@
+"""add comment pagination index
+
+Revision ID: 6e2b9d4c1f83
+Revises: 0a6d4f3e8c27
+Create Date: 2025-11-12 14:21:37.604915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2b9d4c1f83'
+down_revision: Union[str, Sequence[str], None] = '0a6d4f3e8c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_comments() -> bool:
+    # The initial revision predates the comments table; databases that got it
+    # from create_all() are indexed here, the rest when the table is created
+    return sa.inspect(op.get_bind()).has_table('comments')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_comments():
+        op.create_index('ix_comments_poll_id_created_at_id', 'comments', ['poll_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_comments():
+        op.drop_index('ix_comments_poll_id_created_at_id', table_name='comments')
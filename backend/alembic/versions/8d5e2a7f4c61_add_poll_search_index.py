@@ -0,0 +1,48 @@
+"""add poll search index
+
+Revision ID: 8d5e2a7f4c61
+Revises: 3f9a7c2e5b14
+Create Date: 2025-11-19 16:03:12.745190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5e2a7f4c61'
+down_revision: Union[str, Sequence[str], None] = '3f9a7c2e5b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE poll_search ("
+            "poll_id INTEGER PRIMARY KEY REFERENCES polls (id) ON DELETE CASCADE, document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX ix_poll_search_document ON poll_search USING GIN (document)")
+        op.execute(
+            "INSERT INTO poll_search (poll_id, document) "
+            "SELECT polls.id, setweight(to_tsvector('english', polls.question), 'A') || "
+            "setweight(to_tsvector('english', coalesce((SELECT string_agg(label, ' ' ORDER BY position) "
+            "FROM poll_options WHERE poll_id = polls.id), '')), 'B') FROM polls"
+        )
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE poll_search USING fts5("
+            "question, options, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO poll_search (rowid, question, options) "
+            "SELECT polls.id, polls.question, coalesce((SELECT group_concat(label, ' ') "
+            "FROM poll_options WHERE poll_id = polls.id), '') FROM polls"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE poll_search")
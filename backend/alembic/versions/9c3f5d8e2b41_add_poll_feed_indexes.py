@@ -0,0 +1,29 @@
+"""add poll feed indexes
+
+Revision ID: 9c3f5d8e2b41
+Revises: 4b1e7c2a9d10
+Create Date: 2025-11-04 18:32:05.117943
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f5d8e2b41'
+down_revision: Union[str, Sequence[str], None] = '4b1e7c2a9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_polls_likes_id', 'polls', ['likes', 'id'], unique=False)
+    op.create_index('ix_polls_creator_id_id', 'polls', ['creator_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_polls_creator_id_id', table_name='polls')
+    op.drop_index('ix_polls_likes_id', table_name='polls')
@@ -0,0 +1,30 @@
+"""add poll version
+
+Revision ID: b81f4e6a2d59
+Revises: 6e2b9d4c1f83
+Create Date: 2025-11-14 10:42:18.330652
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4e6a2d59'
+down_revision: Union[str, Sequence[str], None] = '6e2b9d4c1f83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.drop_column('version')
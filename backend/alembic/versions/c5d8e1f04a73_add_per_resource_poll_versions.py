@@ -0,0 +1,32 @@
+"""add per-resource poll versions
+
+Revision ID: c5d8e1f04a73
+Revises: 8d5e2a7f4c61
+Create Date: 2025-11-21 09:17:42.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8e1f04a73'
+down_revision: Union[str, Sequence[str], None] = '8d5e2a7f4c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.add_column(sa.Column('results_version', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('comments_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.drop_column('comments_version')
+        batch_op.drop_column('results_version')
@@ -0,0 +1,124 @@
+"""normalize poll options
+
+Revision ID: e57a1c9b3f02
+Revises: 9c3f5d8e2b41
+Create Date: 2025-11-08 11:47:39.208415
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e57a1c9b3f02'
+down_revision: Union[str, Sequence[str], None] = '9c3f5d8e2b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('poll_options',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('label', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('poll_id', 'position', name='unique_poll_option_position')
+    )
+    op.create_index(op.f('ix_poll_options_id'), 'poll_options', ['id'], unique=False)
+
+    # Split every JSON options string into rows
+    conn = op.get_bind()
+    poll_options = sa.table('poll_options',
+        sa.column('poll_id', sa.Integer),
+        sa.column('position', sa.Integer),
+        sa.column('label', sa.String),
+    )
+    rows = []
+    for poll_id, options in conn.execute(sa.text("SELECT id, options FROM polls")):
+        rows.extend(
+            {"poll_id": poll_id, "position": position, "label": label}
+            for position, label in enumerate(json.loads(options))
+        )
+    if rows:
+        op.bulk_insert(poll_options, rows)
+
+    # Point votes at option ids; votes for labels that never existed are dropped
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.add_column(sa.Column('option_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE votes SET option_id = ("
+        "SELECT MIN(po.id) FROM poll_options po "
+        "WHERE po.poll_id = votes.poll_id AND po.label = votes.option)"
+    )
+    op.execute("DELETE FROM votes WHERE option_id IS NULL")
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.alter_column('option_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_votes_option_id_poll_options', 'poll_options', ['option_id'], ['id'])
+        batch_op.drop_column('option')
+
+    # Re-key the maintained tallies on option ids
+    op.drop_table('poll_option_counts')
+    op.create_table('poll_option_counts',
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('vote_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+    sa.ForeignKeyConstraint(['option_id'], ['poll_options.id'], ),
+    sa.PrimaryKeyConstraint('poll_id', 'option_id')
+    )
+    op.execute(
+        "INSERT INTO poll_option_counts (poll_id, option_id, vote_count) "
+        "SELECT poll_id, option_id, COUNT(*) FROM votes "
+        "WHERE poll_id IS NOT NULL GROUP BY poll_id, option_id"
+    )
+
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.drop_column('options')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.add_column(sa.Column('options', sa.String(), nullable=True))
+    labels = {}
+    for poll_id, label in conn.execute(sa.text("SELECT poll_id, label FROM poll_options ORDER BY poll_id, position")):
+        labels.setdefault(poll_id, []).append(label)
+    for poll_id, in conn.execute(sa.text("SELECT id FROM polls")).fetchall():
+        conn.execute(
+            sa.text("UPDATE polls SET options = :options WHERE id = :id"),
+            {"options": json.dumps(labels.get(poll_id, [])), "id": poll_id}
+        )
+    with op.batch_alter_table('polls') as batch_op:
+        batch_op.alter_column('options', existing_type=sa.String(), nullable=False)
+
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.add_column(sa.Column('option', sa.String(), nullable=True))
+    op.execute("UPDATE votes SET option = (SELECT label FROM poll_options po WHERE po.id = votes.option_id)")
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.alter_column('option', existing_type=sa.String(), nullable=False)
+        batch_op.drop_constraint('fk_votes_option_id_poll_options', type_='foreignkey')
+        batch_op.drop_column('option_id')
+
+    op.drop_table('poll_option_counts')
+    op.create_table('poll_option_counts',
+    sa.Column('poll_id', sa.Integer(), nullable=False),
+    sa.Column('option', sa.String(), nullable=False),
+    sa.Column('vote_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['poll_id'], ['polls.id'], ),
+    sa.PrimaryKeyConstraint('poll_id', 'option')
+    )
+    op.execute(
+        "INSERT INTO poll_option_counts (poll_id, option, vote_count) "
+        "SELECT poll_id, option, COUNT(*) FROM votes "
+        "WHERE poll_id IS NOT NULL GROUP BY poll_id, option"
+    )
+
+    op.drop_index(op.f('ix_poll_options_id'), table_name='poll_options')
+    op.drop_table('poll_options')
@@ -1,25 +1,94 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..db.session import get_db
-from ..core.security import verify_token
+from ..core.config import settings
+from ..db.session import get_db, get_async_db
+from ..core.hashing import PasswordHasher
+from ..core.security import decode_token
 from ..models.user import User
+from ..utils.cache import TTLCache
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    username = verify_token(token)
-    if username is None:
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any session so it can be cached."""
+    id: int
+    username: str
+
+# Resolved principals, so most authenticated requests skip the users lookup
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: int, username: Optional[str] = None):
+    """Drop a cached principal; call after a user is renamed, disabled or deleted."""
+    principal_cache.invalidate(f"uid:{user_id}")
+    if username is not None:
+        principal_cache.invalidate(f"name:{username}")
+
+def _token_claims(credentials: HTTPAuthorizationCredentials) -> dict:
+    claims = decode_token(credentials.credentials)
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    return claims
+
+def _principal_query(claims: dict):
+    # Tokens issued before the uid claim existed are resolved by username
+    if claims.get("uid") is not None:
+        return f"uid:{claims['uid']}", select(User.id, User.username).where(User.id == claims["uid"])
+    return f"name:{claims['sub']}", select(User.id, User.username).where(User.username == claims["sub"])
+
+def _cached_principal(key: str) -> Optional[Principal]:
+    if settings.AUTH_CACHE_TTL_SECONDS <= 0:
+        return None
+    return principal_cache.get(key)
+
+def _resolved(key: str, row, token: int) -> Principal:
+    if row is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    principal = Principal(id=row.id, username=row.username)
+    if settings.AUTH_CACHE_TTL_SECONDS > 0:
+        principal_cache.set(key, principal, token)
+    return principal
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    key, query = _principal_query(_token_claims(credentials))
+    principal = _cached_principal(key)
+    if principal is not None:
+        return principal
+    token = principal_cache.token(key)
+    return _resolved(key, db.execute(query).first(), token)
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    key, query = _principal_query(_token_claims(credentials))
+    principal = _cached_principal(key)
+    if principal is not None:
+        return principal
+    token = principal_cache.token(key)
+    return _resolved(key, (await db.execute(query)).first(), token)
+
+@contextmanager
+def password_hashing_capacity():
+    """Turn a saturated password hashing pool into 503 instead of queueing logins behind it."""
+    try:
+        yield
+    except PasswordHasher.HashingBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from ....db.session import get_async_db
+from ....services.async_auth_service import create_user, authenticate_user
+from ....services.auth_service import create_user_token
+from ....api.deps import password_hashing_capacity
+from ....schemas.auth_schema import UserCreate, UserLogin, UserResponse, LoginResponse
+
+router = APIRouter()
+
+@router.post("/register", response_model=UserResponse)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    with password_hashing_capacity():
+        db_user = await create_user(db, user)
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Username already exists")
+    return db_user
+
+@router.post("/login", response_model=LoginResponse)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    with password_hashing_capacity():
+        authenticated_user = await authenticate_user(db, user.username, user.password)
+    if not authenticated_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    access_token = create_user_token(authenticated_user.username, authenticated_user.id)
+    return {"user": authenticated_user, "access_token": access_token}
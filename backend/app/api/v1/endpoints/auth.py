@@ -2,21 +2,24 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ....db.session import get_db
 from ....services.auth_service import create_user, authenticate_user, create_user_token
+from ....api.deps import password_hashing_capacity
 from ....schemas.auth_schema import UserCreate, UserLogin, UserResponse, LoginResponse
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse)
 def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = create_user(db, user)
+    with password_hashing_capacity():
+        db_user = create_user(db, user)
     if not db_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     return db_user
 
 @router.post("/login", response_model=LoginResponse)
 def login(user: UserLogin, db: Session = Depends(get_db)):
-    authenticated_user = authenticate_user(db, user.username, user.password)
+    with password_hashing_capacity():
+        authenticated_user = authenticate_user(db, user.username, user.password)
     if not authenticated_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token = create_user_token(authenticated_user.username)
+    access_token = create_user_token(authenticated_user.username, authenticated_user.id)
     return {"user": authenticated_user, "access_token": access_token}
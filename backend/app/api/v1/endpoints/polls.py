@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Literal, Optional
 from sqlalchemy.orm import Session
 from ....db.session import get_db
-from ....api.deps import get_current_user
-from ....services import poll_service
+from ....api.deps import Principal, get_current_user
+from ....services import poll_cache, poll_service
+from ....services.vote_queue import VoteQueue, get_vote_queue
 from ....schemas import poll_schema
-from ....models.user import User
+from ....utils import fast_json, http_cache
+from ....utils.export import export_response
 
 router = APIRouter()
 
 @router.post("/", response_model=poll_schema.Poll)
-def create_poll(poll: poll_schema.PollBase, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_poll(poll: poll_schema.PollBase, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     poll_create = poll_schema.PollCreate(
         question=poll.question,
         options=poll.options,
@@ -18,23 +22,96 @@ def create_poll(poll: poll_schema.PollBase, db: Session = Depends(get_db), curre
     return poll_service.create_poll(db, poll_create)
 
 @router.get("/", response_model=list[poll_schema.Poll])
-def read_polls(db: Session = Depends(get_db)):
-    return poll_service.get_polls(db)
+def read_polls(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "likes"] = "id",
+    creator_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        page = poll_service.get_polls(db, limit=limit, cursor=cursor, order_by=order_by, creator_id=creator_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return fast_json.list_response(page["items"], response)
+
+@router.get("/status", response_model=list[poll_schema.PollStatus])
+def read_poll_statuses(
+    ids: list[int] = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    vote_queue: Optional[VoteQueue] = Depends(get_vote_queue)
+):
+    # One request for a whole feed page instead of vote-status + like-status per poll
+    return poll_service.get_user_poll_statuses(db, ids, current_user.id, vote_queue)
+
+@router.get("/search", response_model=list[poll_schema.Poll])
+def search_polls(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        page = poll_service.search_polls(db, q, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return fast_json.list_response(page["items"], response)
+
+# Only the per-option counts that /results already shows for every poll, so no auth is needed
+@router.get("/tallies/export")
+def export_tallies(format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_db)):
+    batches = poll_service.export_tallies(db)
+    return export_response(format, poll_service.TALLY_EXPORT_COLUMNS, batches, "poll-tallies")
+
+def _not_modified(request: Request, response: Response, resource: str, poll_id: int, db: Session):
+    # The version is read before the body, so a write in between can only make the tag older than the body
+    versions = poll_cache.get_poll_versions(db, poll_id)
+    version = versions[resource] if versions is not None else None
+    return http_cache.conditional_response(request, response, http_cache.poll_etag(resource, poll_id, version))
 
 @router.get("/{poll_id}", response_model=poll_schema.Poll)
-def get_poll(poll_id: int, db: Session = Depends(get_db)):
-    return poll_service.get_poll(db, poll_id)
+def get_poll(poll_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = _not_modified(request, response, "poll", poll_id, db)
+    if not_modified is not None:
+        return not_modified
+    return poll_cache.get_poll(db, poll_id)
 
 @router.post("/{poll_id}/vote")
-def vote_on_poll(poll_id: int, vote_data: poll_schema.VoteBase, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return poll_service.vote_on_poll(db, poll_id, vote_data.option, current_user.id)
+def vote_on_poll(poll_id: int, vote_data: poll_schema.VoteBase, response: Response, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user), vote_queue: Optional[VoteQueue] = Depends(get_vote_queue)):
+    if vote_queue is None:
+        return poll_service.vote_on_poll(db, poll_id, vote_data.option, current_user.id)
+    result = poll_service.enqueue_vote(db, vote_queue, poll_id, vote_data.option, current_user.id)
+    if result.get("queued"):
+        response.status_code = 202
+    return result
 
 @router.get("/{poll_id}/results")
-def get_poll_results(poll_id: int, db: Session = Depends(get_db)):
-    return poll_service.get_poll_results(db, poll_id)
+def get_poll_results(poll_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = _not_modified(request, response, "results", poll_id, db)
+    if not_modified is not None:
+        return not_modified
+    return poll_cache.get_poll_results(db, poll_id)
+
+@router.get("/{poll_id}/votes/export")
+def export_votes(poll_id: int, format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # Rows name the voters, so only the poll's creator may export them.
+    # Rows are read and sent batch by batch, so memory use does not grow with the poll
+    batches = poll_service.export_poll_votes(db, poll_id, current_user.id)
+    if batches is None:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    if isinstance(batches, dict):
+        raise HTTPException(status_code=403, detail=batches["error"])
+    return export_response(format, poll_service.VOTE_EXPORT_COLUMNS, batches, f"poll-{poll_id}-votes")
 
 @router.post("/{poll_id}/comments", response_model=poll_schema.Comment)
-def add_comment(poll_id: int, comment: poll_schema.CommentBase, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def add_comment(poll_id: int, comment: poll_schema.CommentBase, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     comment_create = poll_schema.CommentCreate(
         content=comment.content,
         user_id=current_user.id
@@ -42,21 +119,41 @@ def add_comment(poll_id: int, comment: poll_schema.CommentBase, db: Session = De
     return poll_service.add_comment(db, poll_id, comment_create)
 
 @router.get("/{poll_id}/comments", response_model=list[poll_schema.Comment])
-def get_comments(poll_id: int, db: Session = Depends(get_db)):
-    return poll_service.get_comments(db, poll_id)
+def get_comments(
+    poll_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    not_modified = _not_modified(request, response, "comments", poll_id, db)
+    if not_modified is not None:
+        return not_modified
+    try:
+        page = poll_service.get_comments(db, poll_id, limit=limit, before=before, after=after, since=since)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return fast_json.list_response(page["items"], response)
 
 @router.get("/{poll_id}/vote-status")
-def check_vote_status(poll_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return poll_service.check_user_voted(db, poll_id, current_user.id)
+def check_vote_status(poll_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user), vote_queue: Optional[VoteQueue] = Depends(get_vote_queue)):
+    return poll_service.check_user_voted(db, poll_id, current_user.id, vote_queue)
 
 @router.get("/{poll_id}/like-status")
-def check_like_status(poll_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def check_like_status(poll_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     return poll_service.check_user_liked(db, poll_id, current_user.id)
 
-@router.post("/{poll_id}/like", response_model=poll_schema.Poll)
-def like_poll(poll_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    poll_service.like_poll(db, poll_id, current_user.id)
-    return poll_service.get_poll(db, poll_id)
+@router.post("/{poll_id}/like", response_model=poll_schema.LikeToggle)
+def like_poll(poll_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = poll_service.like_poll(db, poll_id, current_user.id)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
 
 @router.get("/{poll_id}/likes")
 def get_poll_likes(poll_id: int, db: Session = Depends(get_db)):
@@ -1,6 +1,10 @@
 from fastapi import APIRouter
-from .endpoints import auth, polls
+from ...core.config import settings
 
 api_router = APIRouter()
+if settings.ASYNC_DB:
+    from .endpoints import async_auth as auth, async_polls as polls
+else:
+    from .endpoints import auth, polls
 api_router.include_router(auth.router, tags=["auth"])
 api_router.include_router(polls.router, prefix="/polls", tags=["polls"])
@@ -3,7 +3,57 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"
     DATABASE_URL: str = "sqlite:///./polls.db"
+    # Serve the API from AsyncSession-based handlers (aiosqlite / asyncpg)
+    ASYNC_DB: bool = False
+    # Connection pool (server databases such as Postgres)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables the server-side timeout
+    # Startup schema handling: check (revision must be at head), migrate, create (create_all) or off
+    DB_SCHEMA_MODE: str = "check"
+    # Single-node SQLite installs
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # bcrypt cost and the dedicated pool that computes hashes (0 workers = one per CPU)
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Resolved users are cached per process so authenticated requests skip the users lookup
+    AUTH_CACHE_TTL_SECONDS: float = 60  # 0 disables the cache
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    # Write-behind voting: accept votes with 202 and insert them in batches
+    VOTE_QUEUE_ENABLED: bool = False
+    VOTE_QUEUE_MAX_BATCH: int = 500
+    VOTE_QUEUE_FLUSH_INTERVAL_MS: int = 50
+    VOTE_QUEUE_MAX_PENDING: int = 10000
+    # Poll detail/results cache; empty = in-process LRU, redis://... = shared across replicas
+    CACHE_URL: str = ""
+    CACHE_TTL_SECONDS: float = 30  # 0 disables caching
+    CACHE_MAX_ENTRIES: int = 1024
+    # Cache-Control max-age on ETag-tagged poll, results and comments reads
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+    # Encode poll and comment lists without re-validating each item (uses orjson when installed)
+    FAST_JSON_RESPONSES: bool = False
+    # Pub/sub backend for WebSocket fan-out; empty = in-process, redis://... = shared across replicas
+    BROKER_URL: str = ""
+    # Per-socket send queue; a client that falls this far behind is dropped from or disconnected
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SLOW_CONSUMER_POLICY: str = "disconnect"  # or "drop" to skip messages instead
+    # Vote/like events per poll are merged into one tally message per window (0 disables)
+    WS_COALESCE_WINDOW_MS: int = 100
+    # Token bucket per user (per IP without a token) on vote, like and comment writes; 0 disables
+    RATE_LIMIT_PER_SECOND: float = 5
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_URL: str = ""  # empty = per process, redis://... = shared across workers and replicas
+    # Requests in flight per worker before new ones are answered 503 (0 = unlimited)
+    MAX_CONCURRENT_REQUESTS: int = 0
+    # Request timing/SQL metrics on /metrics; warn when a request runs more statements than the threshold (0 = never)
+    METRICS_ENABLED: bool = True
+    METRICS_QUERY_WARN_THRESHOLD: int = 20
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost", "http://frontend:3000", "https://pollify.xyz"]
     
     class Config:
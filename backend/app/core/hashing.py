@@ -0,0 +1,137 @@
+"""Password hashing on a dedicated, bounded worker pool.
+
+bcrypt is deliberately slow, so hashes are computed on a small thread pool
+(bcrypt releases the GIL, so the threads use separate cores) instead of on
+request threads or the event loop. When more than max_pending hashes are
+waiting, callers get PasswordHasher.HashingBusyError straight away instead of queueing
+behind minutes of work.
+
+Logins for unknown usernames verify against dummy_hash(), a bcrypt hash of a
+random password at the configured cost, so a miss takes as long as a wrong
+password and response times do not reveal which usernames exist.
+
+Hashes created before bcrypt are unsalted SHA-256 hex digests. They still
+verify, and needs_rehash() reports them so login can upgrade them in place.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+BCRYPT_MAX_BYTES = 72
+
+def _is_legacy_sha256(hashed: str) -> bool:
+    return len(hashed) == 64 and not hashed.startswith("$")
+
+def _bcrypt_rounds(hashed: str) -> Optional[int]:
+    # $2b$12$<salt+checksum>
+    parts = hashed.split("$")
+    if len(parts) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+class PasswordHasher:
+    class HashingBusyError(Exception):
+        pass
+
+    def __init__(self, rounds: int = 12, workers: int = 0, max_pending: int = 64):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        # Computed in the background so it is ready before the first failed login
+        self._dummy = self._pool.submit(self._hash, secrets.token_hex(16))
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        if _is_legacy_sha256(hashed):
+            # Cheap enough to check inline
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+        return self._submit(self._verify, password, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self._hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        if not hashed or _is_legacy_sha256(hashed):
+            return self.verify(password, hashed)
+        return await asyncio.wrap_future(self._submit(self._verify, password, hashed))
+
+    def dummy_hash(self) -> str:
+        return self._dummy.result()
+
+    async def dummy_hash_async(self) -> str:
+        return await asyncio.wrap_future(self._dummy)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True for legacy SHA-256 hashes and bcrypt hashes below the configured cost."""
+        rounds = _bcrypt_rounds(hashed or "")
+        return rounds is None or rounds < self.rounds
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise self.HashingBusyError(f"{self.max_pending} password hashes already pending")
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_BYTES], salt).decode()
+
+    def _verify(self, password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode()[:BCRYPT_MAX_BYTES], hashed.encode())
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide hasher built from the PASSWORD_* settings on first use."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            from .config import settings
+            _hasher = PasswordHasher(
+                rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+                workers=settings.PASSWORD_HASH_WORKERS,
+                max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+            )
+        return _hasher
+
+def set_password_hasher(hasher: PasswordHasher):
+    """Replace the process-wide hasher (tests use a low bcrypt cost)."""
+    global _hasher
+    with _hasher_lock:
+        previous, _hasher = _hasher, hasher
+    if previous is not None and previous is not hasher:
+        previous.shutdown()
+
+def shutdown_password_hasher():
+    global _hasher
+    with _hasher_lock:
+        hasher, _hasher = _hasher, None
+    if hasher is not None:
+        hasher.shutdown()
@@ -4,3 +4,5 @@ from ..models.polls import Poll
 from ..models.vote import Vote
 from ..models.comment import Comment
 from ..models.like import Like
+from ..models.poll_option import PollOption
+from ..models.poll_option_count import PollOptionCount
@@ -0,0 +1,84 @@
+"""Schema preparation on startup, driven by the Alembic history.
+
+DB_SCHEMA_MODE picks what a starting worker does:
+
+- check (default): compare alembic_version with the newest revision and refuse
+  to start on a mismatch. This is one SELECT, so any number of workers can boot
+  at once; run `alembic upgrade head` once before starting them.
+- migrate: run `alembic upgrade head` in-process first. On Postgres, concurrent
+  runs are serialized by an advisory lock; SQLite has no such lock, so let a
+  single process migrate a SQLite database.
+- create: Base.metadata.create_all(), for throwaway SQLite databases.
+- off: do nothing.
+"""
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+SCHEMA_MODES = ("check", "migrate", "create", "off")
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Key of the Postgres advisory lock held while migrating ("pollify" in ASCII)
+MIGRATION_LOCK_ID = 0x706F6C6C696679
+# Revision matching the schema create_all() produced before migrations ran the
+# schema; the later migrations then convert the data (poll options, tallies, votes)
+LEGACY_REVISION = "dd20dd3b5f85"
+
+class SchemaError(RuntimeError):
+    pass
+
+def alembic_config():
+    from alembic.config import Config
+    return Config(str(ALEMBIC_INI))
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine: Engine) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def is_legacy_schema(connection: Connection) -> bool:
+    """True for a database create_all() built before it had a migration history."""
+    from alembic.runtime.migration import MigrationContext
+    return (
+        MigrationContext.configure(connection).get_current_revision() is None
+        and inspect(connection).has_table("polls")
+    )
+
+def check_schema(engine: Engine):
+    """Raise SchemaError unless the database is at the newest migration."""
+    head = head_revision()
+    current = current_revision(engine)
+    if current == head:
+        return
+    if current is None and inspect(engine).has_table("polls"):
+        raise SchemaError(
+            "The database was created without migrations; `alembic upgrade head` "
+            f"adopts it (stamping it at {LEGACY_REVISION} first) and converts its data"
+        )
+    raise SchemaError(f"Database schema is at {current or 'no revision'}, expected {head}; run `alembic upgrade head`")
+
+def upgrade_schema(engine: Engine):
+    from alembic import command
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        config.attributes["upgrading"] = True
+        command.upgrade(config, "head")
+
+def prepare_schema(engine: Engine, mode: str):
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unsupported DB_SCHEMA_MODE: {mode}")
+    if mode == "off":
+        return
+    if mode == "create":
+        from .base import Base
+        Base.metadata.create_all(bind=engine)
+        return
+    if mode == "migrate":
+        upgrade_schema(engine)
+    check_schema(engine)
@@ -0,0 +1,119 @@
+"""Full-text index over poll questions and option labels.
+
+- SQLite: FTS5 table poll_search(question, options) whose rowid is the poll
+  id, ranked with bm25 and the question weighted above the options.
+- Postgres: poll_search(poll_id, document tsvector) with a GIN index, ranked
+  with ts_rank.
+
+Both rank with "lower is better", so pages are keyset-paginated on
+(rank, poll_id) the same way. The table lives outside the ORM metadata: the
+migrations create it, create_all() creates it via the metadata hook below,
+and create_poll keeps it in sync.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.sql.elements import TextClause
+
+from .session import Base
+
+SEARCH_TABLE = "poll_search"
+MAX_TERMS = 8
+
+_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS poll_search USING fts5("
+        "question, options, tokenize = 'porter unicode61 remove_diacritics 2')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS poll_search ("
+        "poll_id INTEGER PRIMARY KEY REFERENCES polls (id) ON DELETE CASCADE, document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_poll_search_document ON poll_search USING GIN (document)",
+    ],
+}
+
+_POSTGRES_DOCUMENT = "setweight(to_tsvector('english', {question}), 'A') || setweight(to_tsvector('english', {options}), 'B')"
+_OPTION_LABELS = {
+    "sqlite": "(SELECT group_concat(label, ' ') FROM poll_options WHERE poll_id = polls.id)",
+    "postgresql": "(SELECT string_agg(label, ' ' ORDER BY position) FROM poll_options WHERE poll_id = polls.id)",
+}
+
+def supported(dialect: str) -> bool:
+    return dialect in _DDL
+
+def create_search_index(connection):
+    for statement in _DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+def drop_search_index(connection):
+    if supported(connection.dialect.name):
+        connection.exec_driver_sql("DROP TABLE IF EXISTS poll_search")
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    create_search_index(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    drop_search_index(connection)
+
+def include_name(name, type_, parent_names) -> bool:
+    """Alembic filter: the search table and FTS5's shadow tables are not in the metadata."""
+    return not (type_ == "table" and name.startswith(SEARCH_TABLE))
+
+def index_statement(dialect: str) -> Optional[TextClause]:
+    """INSERT for one poll, taking :poll_id, :question and :options (labels joined by spaces)."""
+    if dialect == "sqlite":
+        return text("INSERT INTO poll_search (rowid, question, options) VALUES (:poll_id, :question, :options)")
+    if dialect == "postgresql":
+        document = _POSTGRES_DOCUMENT.format(question=":question", options=":options")
+        return text(f"INSERT INTO poll_search (poll_id, document) VALUES (:poll_id, {document})")
+    return None
+
+def rebuild_statements(dialect: str) -> List[TextClause]:
+    labels = f"coalesce({_OPTION_LABELS[dialect]}, '')"
+    if dialect == "sqlite":
+        fill = f"INSERT INTO poll_search (rowid, question, options) SELECT polls.id, polls.question, {labels} FROM polls"
+    else:
+        document = _POSTGRES_DOCUMENT.format(question="polls.question", options=labels)
+        fill = f"INSERT INTO poll_search (poll_id, document) SELECT polls.id, {document} FROM polls"
+    return [text("DELETE FROM poll_search"), text(fill)]
+
+_WORD = re.compile(r"\w+")
+
+def search_terms(query: str) -> List[str]:
+    # Only word characters reach the MATCH / tsquery syntax, so user input cannot break it
+    terms = _WORD.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        raise ValueError("Search query has no words")
+    return terms
+
+def _match_expression(dialect: str, terms: List[str]) -> str:
+    # Every term must match; the last one as a prefix, for search-as-you-type
+    if dialect == "sqlite":
+        return " ".join(f'"{term}"' for term in terms) + "*"
+    return " & ".join(terms) + ":*"
+
+_RANKED = {
+    "sqlite": (
+        "SELECT rowid AS poll_id, bm25(poll_search, 2.0, 1.0) AS rank "
+        "FROM poll_search WHERE poll_search MATCH :query"
+    ),
+    "postgresql": (
+        "SELECT poll_id, -CAST(ts_rank(document, query) AS DOUBLE PRECISION) AS rank "
+        "FROM poll_search, to_tsquery('english', :query) AS query WHERE document @@ query"
+    ),
+}
+
+def ranked_query(dialect: str, terms: List[str], limit: int, after: Optional[Tuple[float, int]] = None):
+    """(statement, params) returning (poll_id, rank) rows, best match first."""
+    if dialect not in _RANKED:
+        raise ValueError(f"Search is not available on {dialect}")
+    params = {"query": _match_expression(dialect, terms), "limit": limit}
+    where = ""
+    if after is not None:
+        where = "WHERE rank > :after_rank OR (rank = :after_rank AND poll_id > :after_id) "
+        params.update(after_rank=after[0], after_id=after[1])
+    statement = text(f"SELECT poll_id, rank FROM ({_RANKED[dialect]}) AS matches {where}ORDER BY rank, poll_id LIMIT :limit")
+    return statement, params
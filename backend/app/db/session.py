@@ -1,17 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+def engine_options(url: str) -> dict:
+    """Build create_engine keyword arguments appropriate for the URL's backend."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        # SQLite has no server-side pool to size; the pool class is chosen by the dialect
+        if url.get_driver_name() == "pysqlite":
+            return {"connect_args": {"check_same_thread": False}}
+        return {}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+def _install_sqlite_pragmas(sync_engine):
+    in_memory = sync_engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if settings.SQLITE_WAL and not in_memory:
+            # WAL lets readers proceed while a vote commits; NORMAL sync is safe under WAL
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+def create_db_engine(url: str, **overrides):
+    db_engine = create_engine(url, **{**engine_options(url), **overrides})
+    if db_engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(db_engine)
+    return db_engine
+
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def create_async_session_factory(url: str, **engine_kwargs):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = async_database_url(url)
+    async_engine = create_async_engine(async_url, **{**engine_options(async_url), **engine_kwargs})
+    if async_engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(async_engine.sync_engine)
+    # Attributes must stay loaded after commit: lazy refreshes cannot run outside a greenlet
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+AsyncSessionLocal = create_async_session_factory(settings.DATABASE_URL) if settings.ASYNC_DB else None
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally: 
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,17 +1,91 @@
+from contextlib import asynccontextmanager
+import json
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .core.config import settings
-from .db.session import Base, engine
+from .db.session import engine
+from .db.migrations import prepare_schema
 from .api.v1.router import api_router
 from .utils.websocket_manager import ConnectionManager
+from .utils.pubsub import create_broker
+from .utils import events
+from .utils.coalescer import EventCoalescer
+from .services.vote_queue import get_vote_queue, shutdown_vote_queue
+from .core.hashing import shutdown_password_hasher
+from .services import poll_cache
+from .api.deps import principal_cache
+from .utils.metrics import registry
+from .utils.instrumentation import RequestMetricsMiddleware, install_query_hooks
+from .utils.admission import AdmissionControlMiddleware
+from .utils.rate_limit import create_rate_limiter
 
 # Import all models to ensure relationships work
-from .models import user, polls, vote, comment, like
+from .models import user, polls, vote, comment, like, poll_option, poll_option_count
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+manager = ConnectionManager(
+    create_broker(settings.BROKER_URL),
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    slow_consumer_policy=settings.WS_SLOW_CONSUMER_POLICY,
+)
+coalescer = EventCoalescer(manager.publish_nowait, settings.WS_COALESCE_WINDOW_MS / 1000)
+events.add_listener(coalescer.submit)
+if settings.BROKER_URL and not settings.CACHE_URL and settings.CACHE_TTL_SECONDS > 0:
+    # Every worker keeps its own poll cache, so writes must reach the others through the broker
+    poll_cache.relay_invalidations(manager)
+
+rate_limiter = (
+    create_rate_limiter(settings.RATE_LIMIT_URL, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+    if settings.RATE_LIMIT_PER_SECOND > 0 else None
+)
+
+def _cache_stats():
+    caches = {"poll": poll_cache.get_cache(), "principal": principal_cache}
+    return [
+        ({"cache": name, "event": event}, count)
+        for name, cache in caches.items() if cache is not None
+        for event, count in cache.stats.items()
+    ]
+
+registry.callback("pollify_websocket_connections", "Open /ws connections", lambda: len(manager.active_connections))
+registry.callback(
+    "pollify_websocket_messages_total", "WebSocket deliveries by outcome",
+    lambda: [({"outcome": outcome}, count) for outcome, count in manager.stats.items()], type="counter",
+)
+registry.callback("pollify_cache_events_total", "Cache lookups, writes and invalidations", _cache_stats, type="counter")
+registry.callback(
+    "pollify_event_coalescer_events_total", "Vote and like events received, tallies emitted and events merged away",
+    lambda: [({"event": event}, count) for event, count in coalescer.stats.items()], type="counter",
+)
+
+def _vote_queue_stats():
+    queue = get_vote_queue()
+    return [({"event": event}, count) for event, count in queue.stats.items()] if queue is not None else []
+
+registry.callback("pollify_vote_queue_events_total", "Write-behind votes queued and written, and batches committed or failed", _vote_queue_stats, type="counter")
+install_query_hooks()
 
-app = FastAPI(title="Pollify API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Once per worker at startup, not on import; by default only the revision is checked
+    prepare_schema(engine, settings.DB_SCHEMA_MODE)
+    await manager.start()
+    yield
+    shutdown_vote_queue()
+    shutdown_password_hasher()
+    coalescer.stop()
+    await manager.stop()
+
+app = FastAPI(title="Pollify API", version="1.0.0", lifespan=lifespan)
+
+# Added first so it runs inside CORS (rejections stay readable by the browser) and metrics
+if rate_limiter is not None or settings.MAX_CONCURRENT_REQUESTS:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        registry=registry,
+        limiter=rate_limiter,
+        max_concurrent=settings.MAX_CONCURRENT_REQUESTS,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,19 +93,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After"],
 )
 
-manager = ConnectionManager()
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        registry=registry,
+        query_warn_threshold=settings.METRICS_QUERY_WARN_THRESHOLD,
+    )
 
 app.include_router(api_router, prefix="/api/v1")
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    # Clients send {"action": "subscribe" | "unsubscribe", "topic": "poll:<id>"}
+    # and then receive the vote/like/comment events published for that poll
     await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
-            await manager.broadcast({"message": data})
+            try:
+                request = json.loads(data)
+                action, topic = request["action"], request["topic"]
+                if action == "subscribe":
+                    manager.subscribe(websocket, topic)
+                elif action == "unsubscribe":
+                    manager.unsubscribe(websocket, topic)
+                else:
+                    raise ValueError(f"Unknown action: {action}")
+            except (ValueError, KeyError, TypeError) as exc:
+                manager.send_personal(websocket, {"type": "error", "detail": str(exc)})
+                continue
+            manager.send_personal(websocket, {"type": f"{action}d", "topic": topic})
     except Exception:
         manager.disconnect(websocket)
 
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from ..db.session import Base
+
+class PollOption(Base):
+    __tablename__ = "poll_options"
+
+    id = Column(Integer, primary_key=True, index=True)
+    poll_id = Column(Integer, ForeignKey("polls.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    label = Column(String, nullable=False)
+
+    __table_args__ = (UniqueConstraint('poll_id', 'position', name='unique_poll_option_position'),)
+
+    poll = relationship("Poll", back_populates="options")
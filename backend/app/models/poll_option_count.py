@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from ..db.session import Base
+
+class PollOptionCount(Base):
+    __tablename__ = "poll_option_counts"
+
+    # Maintained tally per option, updated in the same transaction as the vote insert
+    poll_id = Column(Integer, ForeignKey("polls.id"), primary_key=True)
+    option_id = Column(Integer, ForeignKey("poll_options.id"), primary_key=True)
+    vote_count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
@@ -7,9 +7,21 @@ class Poll(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     question = Column(String, nullable=False)
-    options = Column(String, nullable=False)  # store as JSON string
     creator_id = Column(Integer, ForeignKey("users.id"))
     likes = Column(Integer, default=0)
+    # Change counters behind the ETags of the poll's reads, one per resource, so a
+    # write only invalidates the reads it changes: the poll itself (likes), its
+    # results (votes, likes, tally rebuilds) and its comments
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    results_version = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Keyset pagination indexes for the poll feed
+    __table_args__ = (
+        Index("ix_polls_likes_id", "likes", "id"),
+        Index("ix_polls_creator_id_id", "creator_id", "id"),
+    )
 
     creator = relationship("User", back_populates="polls")
     comments = relationship("Comment", back_populates="poll")
+    options = relationship("PollOption", back_populates="poll", order_by="PollOption.position")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
@@ -7,7 +7,10 @@ class Vote(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     poll_id = Column(Integer, ForeignKey("polls.id"))
-    option = Column(String, nullable=False)
+    option_id = Column(Integer, ForeignKey("poll_options.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"))
 
+    __table_args__ = (Index("ix_votes_poll_id_user_id", "poll_id", "user_id", unique=True),)
+
     poll = relationship("Poll")
+    option = relationship("PollOption")
@@ -1,7 +1,6 @@
-from pydantic import BaseModel, ConfigDict, field_validator
-from typing import List
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 from datetime import datetime
-import json
 
 class PollBase(BaseModel):
     question: str
@@ -24,6 +23,18 @@ class CommentCreate(BaseModel):
     content: str
     user_id: int
 
+class LikeToggle(BaseModel):
+    message: str
+    poll_id: int
+    liked: bool
+    likes: int
+
+class PollStatus(BaseModel):
+    poll_id: int
+    has_voted: bool
+    selected_option: Optional[str] = None
+    has_liked: bool
+
 class Comment(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -39,10 +50,3 @@ class Poll(PollBase):
     id: int
     likes: int
     username: str
-    
-    @field_validator('options', mode='before')
-    @classmethod
-    def parse_options(cls, v):
-        if isinstance(v, str):
-            return json.loads(v)
-        return v
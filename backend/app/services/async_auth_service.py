@@ -0,0 +1,31 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.user import User
+from ..schemas.auth_schema import UserCreate
+from ..core.hashing import get_password_hasher
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    # Check if user already exists
+    existing_user = await db.scalar(select(User).where(User.username == user.username))
+    if existing_user:
+        return None
+
+    hashed_password = await get_password_hasher().hash_async(user.password)
+    db_user = User(username=user.username, password=hashed_password)
+    db.add(db_user)
+    await db.commit()
+    return db_user
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.username == username))
+    hasher = get_password_hasher()
+    if user is None:
+        # Same bcrypt work as a wrong password, so the timing does not reveal the miss
+        await hasher.verify_async(password, await hasher.dummy_hash_async())
+        return None
+    if await hasher.verify_async(password, user.password):
+        if hasher.needs_rehash(user.password):
+            user.password = await hasher.hash_async(password)
+            await db.commit()
+        return user
+    return None
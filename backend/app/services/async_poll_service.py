@@ -0,0 +1,230 @@
+"""AsyncSession counterparts of poll_service, used when ASYNC_DB is enabled.
+
+Statements and response shaping are shared with poll_service so both paths
+return identical payloads.
+"""
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..models.polls import Poll
+from ..models.poll_option import PollOption
+from ..models.vote import Vote
+from ..models.comment import Comment
+from ..models.like import Like
+from ..models.user import User
+from ..db import search
+from ..schemas import poll_schema
+from ..utils import events
+from .poll_service import (
+    EXPORT_BATCH_SIZE,
+    _bump_version,
+    _comment_event,
+    _comment_to_dict,
+    _comments_page,
+    _comments_select,
+    _feed_after,
+    _feed_page,
+    _feed_sort_key,
+    _like_delete,
+    _like_event,
+    _like_insert,
+    _like_result,
+    _likes_update,
+    _option_count_upsert,
+    _option_tallies,
+    _poll_statuses,
+    _poll_to_dict,
+    _polls_by_id,
+    _results_to_dict,
+    _search_page,
+    _search_params,
+    _search_query,
+    _tally_export_query,
+    _user_likes,
+    _user_votes,
+    _versions_select,
+    _versions_to_dict,
+    _vote_event,
+    _vote_export_query,
+    _vote_insert,
+)
+
+async def create_poll(db: AsyncSession, poll: poll_schema.PollCreate):
+    db_poll = Poll(
+        question=poll.question,
+        creator_id=poll.creator_id,
+        options=[PollOption(position=i, label=label) for i, label in enumerate(poll.options)]
+    )
+    db.add(db_poll)
+    await db.flush()
+    statement = search.index_statement(db.get_bind().dialect.name)
+    if statement is not None:
+        await db.execute(statement, _search_params(db_poll.id, poll.question, poll.options))
+    await db.commit()
+
+    username = await db.scalar(select(User.username).where(User.id == poll.creator_id))
+    return {
+        "id": db_poll.id,
+        "question": db_poll.question,
+        "options": list(poll.options),
+        "likes": db_poll.likes,
+        "username": username or "Unknown"
+    }
+
+async def get_polls(db: AsyncSession, limit: int = 20, cursor: str = None, order_by: str = "id", creator_id: int = None):
+    sort_key = _feed_sort_key(order_by)
+    stmt = (
+        select(Poll, User.username)
+        .join(User, Poll.creator_id == User.id)
+        .options(selectinload(Poll.options))
+    )
+    if creator_id is not None:
+        stmt = stmt.where(Poll.creator_id == creator_id)
+    if cursor:
+        stmt = stmt.where(_feed_after(cursor, sort_key))
+    stmt = stmt.order_by(*(column.desc() for column in sort_key)).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    return _feed_page(rows, limit, order_by)
+
+async def get_poll_versions(db: AsyncSession, poll_id: int):
+    return _versions_to_dict((await db.execute(_versions_select(poll_id))).first())
+
+async def search_polls(db: AsyncSession, q: str, limit: int = 20, cursor: str = None):
+    statement, params = _search_query(db, q, limit, cursor)
+    hits = [tuple(hit) for hit in (await db.execute(statement, params)).all()]
+    rows = (await db.execute(_polls_by_id([poll_id for poll_id, _ in hits[:limit]]))).all() if hits else []
+    return _search_page(hits, rows, limit)
+
+async def get_poll(db: AsyncSession, poll_id: int):
+    stmt = (
+        select(Poll, User.username)
+        .join(User, Poll.creator_id == User.id)
+        .options(selectinload(Poll.options))
+        .where(Poll.id == poll_id)
+    )
+    result = (await db.execute(stmt)).first()
+    if result:
+        poll, username = result
+        return _poll_to_dict(poll, username)
+    return None
+
+async def vote_on_poll(db: AsyncSession, poll_id: int, option: str, user_id: int):
+    option_id = await db.scalar(_vote_insert(db, poll_id, option, user_id))
+    if option_id is None:
+        if await db.scalar(select(Poll.id).where(Poll.id == poll_id)) is None:
+            return {"error": "Poll not found"}
+        option_exists = await db.scalar(
+            select(PollOption.id).where(PollOption.poll_id == poll_id, PollOption.label == option).limit(1)
+        )
+        if option_exists is None:
+            return {"error": "Invalid option"}
+        return {"error": "User already voted on this poll"}
+
+    count = await db.scalar(_option_count_upsert(db, poll_id, option_id))
+    await db.execute(_bump_version("results", poll_id))
+    await db.commit()
+    events.publish(events.poll_topic(poll_id), _vote_event(poll_id, option_id, option, count))
+
+    return {"message": "Vote recorded successfully", "poll_id": poll_id, "option": option, "option_id": option_id}
+
+async def enqueue_vote(db: AsyncSession, queue, poll_id: int, option: str, user_id: int):
+    option_id = await db.scalar(
+        select(PollOption.id)
+        .where(PollOption.poll_id == poll_id, PollOption.label == option)
+        .order_by(PollOption.position)
+        .limit(1)
+    )
+    if option_id is None:
+        if await db.scalar(select(Poll.id).where(Poll.id == poll_id)) is None:
+            return {"error": "Poll not found"}
+        return {"error": "Invalid option"}
+    already_voted = await db.scalar(select(Vote.id).where(Vote.poll_id == poll_id, Vote.user_id == user_id))
+    if queue.pending_vote(poll_id, user_id) or already_voted:
+        return {"error": "User already voted on this poll"}
+
+    try:
+        queued = queue.submit(poll_id, option_id, option, user_id)
+    except queue.QueueFullError:
+        return await vote_on_poll(db, poll_id, option, user_id)
+    if not queued:
+        return {"error": "User already voted on this poll"}
+    return {"message": "Vote accepted", "poll_id": poll_id, "option": option, "option_id": option_id, "queued": True}
+
+async def get_poll_results(db: AsyncSession, poll_id: int):
+    poll = await db.get(Poll, poll_id)
+    if not poll:
+        return {"error": "Poll not found"}
+
+    rows = (await db.execute(_option_tallies(poll_id))).all()
+    return _results_to_dict(poll, rows)
+
+async def _row_batches(result):
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+async def export_poll_votes(db: AsyncSession, poll_id: int, user_id: int, batch_size: int = EXPORT_BATCH_SIZE):
+    poll = await db.get(Poll, poll_id)
+    if poll is None:
+        return None
+    if poll.creator_id != user_id:
+        return {"error": "Only the poll's creator can export its votes"}
+    return _row_batches(await db.stream(_vote_export_query(poll_id, batch_size)))
+
+async def export_tallies(db: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE):
+    return _row_batches(await db.stream(_tally_export_query(batch_size)))
+
+async def like_poll(db: AsyncSession, poll_id: int, user_id: int):
+    liked = await db.scalar(_like_insert(db, poll_id, user_id)) is not None
+    if not liked and await db.scalar(_like_delete(poll_id, user_id)) is None:
+        return {"error": "Poll not found"}
+
+    likes, version = (await db.execute(_likes_update(poll_id, 1 if liked else -1))).one()
+    await db.commit()
+    events.publish(events.poll_topic(poll_id), _like_event(poll_id, liked, likes, version))
+    return _like_result(poll_id, liked, likes)
+
+async def add_comment(db: AsyncSession, poll_id: int, comment: poll_schema.CommentCreate):
+    db_comment = Comment(
+        poll_id=poll_id,
+        content=comment.content,
+        user_id=comment.user_id
+    )
+    db.add(db_comment)
+    await db.execute(_bump_version("comments", poll_id))
+    await db.commit()
+
+    username = await db.scalar(select(User.username).where(User.id == comment.user_id))
+    result = _comment_to_dict(db_comment, username or "Unknown")
+    events.publish(events.poll_topic(poll_id), _comment_event(poll_id, result))
+    return result
+
+async def get_comments(db: AsyncSession, poll_id: int, limit: int = 50, before: str = None, after: str = None, since: datetime = None):
+    rows = (await db.execute(_comments_select(poll_id, limit, before, after, since))).all()
+    return _comments_page(rows, limit)
+
+async def check_user_voted(db: AsyncSession, poll_id: int, user_id: int, queue=None):
+    pending = queue.pending_vote(poll_id, user_id) if queue is not None else None
+    if pending:
+        return {"has_voted": True, "selected_option": pending["option"]}
+    label = await db.scalar(
+        select(PollOption.label)
+        .join(Vote, Vote.option_id == PollOption.id)
+        .where(Vote.poll_id == poll_id, Vote.user_id == user_id)
+    )
+    return {"has_voted": label is not None, "selected_option": label}
+
+async def get_user_poll_statuses(db: AsyncSession, poll_ids: list[int], user_id: int, queue=None):
+    poll_ids = list(dict.fromkeys(poll_ids))
+    votes = dict((await db.execute(_user_votes(poll_ids, user_id))).all())
+    liked = set(await db.scalars(_user_likes(poll_ids, user_id)))
+    return _poll_statuses(poll_ids, votes, liked, queue, user_id)
+
+async def check_user_liked(db: AsyncSession, poll_id: int, user_id: int):
+    like_id = await db.scalar(select(Like.id).where(Like.poll_id == poll_id, Like.user_id == user_id))
+    return {"has_liked": like_id is not None}
+
+async def get_poll_likes(db: AsyncSession, poll_id: int):
+    stmt = select(User.username).join(Like, Like.user_id == User.id).where(Like.poll_id == poll_id)
+    usernames = (await db.scalars(stmt)).all()
+    return [{"username": username} for username in usernames]
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from ..models.user import User
 from ..schemas.auth_schema import UserCreate
+from ..core.hashing import get_password_hasher
 from ..core.security import get_password_hash, verify_password, create_access_token
 
 def create_user(db: Session, user: UserCreate):
@@ -18,9 +19,21 @@ def create_user(db: Session, user: UserCreate):
 
 def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
-    if user and verify_password(password, user.password):
+    if user is None:
+        # Same bcrypt work as a wrong password, so the timing does not reveal the miss
+        verify_password(password, get_password_hasher().dummy_hash())
+        return None
+    if verify_password(password, user.password):
+        if get_password_hasher().needs_rehash(user.password):
+            # Upgrade legacy SHA-256 (or cheaper bcrypt) hashes while we have the password
+            user.password = get_password_hash(password)
+            db.commit()
         return user
     return None
 
-def create_user_token(username: str):
-    return create_access_token(data={"sub": username})
+def create_user_token(username: str, user_id: int = None):
+    # The uid claim lets get_current_user resolve the caller by primary key
+    claims = {"sub": username}
+    if user_id is not None:
+        claims["uid"] = user_id
+    return create_access_token(data=claims)
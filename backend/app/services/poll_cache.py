@@ -0,0 +1,179 @@
+"""Read-through cache in front of the poll detail, results and ETag version reads.
+
+Every vote, like and comment publishes an event after its commit; the cache
+listens for those and drops the poll's entries, so a read that follows a write
+always goes back to the database. Missing polls are never cached.
+
+Events only reach listeners in the process that made the write. With a shared
+(Redis) cache that is enough; a per-process LRU in several workers also needs
+relay_invalidations(), which sends every invalidation through the pub/sub broker.
+
+A blocking (Redis) cache is never called on the event loop. The async reads run
+their round trips in a thread, and the invalidations of async writes go to a
+single background thread in commit order. An async read of a poll first waits
+for that poll's pending invalidation.
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..utils import events
+from ..utils.cache import create_cache
+from . import async_poll_service, poll_service
+
+_cache = None
+_cache_lock = threading.Lock()
+_invalidator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="poll-cache-invalidate")
+_pending: dict[int, Future] = {}
+_pending_lock = threading.Lock()
+
+def get_cache():
+    """Process-wide poll cache, or None when CACHE_TTL_SECONDS is 0."""
+    global _cache
+    from ..core.config import settings
+    if settings.CACHE_TTL_SECONDS <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = create_cache(settings.CACHE_URL, maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+            events.add_listener(_invalidate_on_event)
+        return _cache
+
+def poll_key(poll_id: int) -> str:
+    return f"poll:{poll_id}"
+
+def results_key(poll_id: int) -> str:
+    return f"results:{poll_id}"
+
+def versions_key(poll_id: int) -> str:
+    return f"versions:{poll_id}"
+
+def invalidate_poll(poll_id: int):
+    cache = get_cache()
+    if cache is not None:
+        cache.invalidate(poll_key(poll_id))
+        cache.invalidate(results_key(poll_id))
+        cache.invalidate(versions_key(poll_id))
+
+def invalidate_all():
+    """Drop every cached poll, e.g. after tallies were rebuilt outside the write paths."""
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
+
+def _invalidate_on_event(topic: str, event: dict):
+    if "poll_id" not in event:
+        return
+    poll_id = event["poll_id"]
+    cache = get_cache()
+    if cache is None or not cache.blocking or not _on_event_loop():
+        invalidate_poll(poll_id)
+        return
+    future = _invalidator.submit(invalidate_poll, poll_id)
+    with _pending_lock:
+        _pending[poll_id] = future
+    future.add_done_callback(lambda done: _forget_pending(poll_id, done))
+
+def _forget_pending(poll_id: int, future: Future):
+    with _pending_lock:
+        if _pending.get(poll_id) is future:
+            del _pending[poll_id]
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+def relay_invalidations(manager) -> events.Listener:
+    """Publish each poll write on the broker and drop the poll from this process's cache when one arrives.
+
+    Returns the event listener, so it can be removed again.
+    """
+    def publish(topic: str, event: dict):
+        if "poll_id" in event:
+            manager.publish_nowait(INVALIDATION_CHANNEL, {"poll_id": event["poll_id"]})
+
+    events.add_listener(publish)
+    manager.on_channel(INVALIDATION_CHANNEL, _on_invalidation)
+    return publish
+
+def _on_invalidation(data: str):
+    poll_id = json.loads(data).get("poll_id")
+    if poll_id is None:
+        invalidate_all()
+    else:
+        invalidate_poll(poll_id)
+
+async def broadcast_invalidation(broker, poll_id: Optional[int] = None):
+    """Make every worker running relay_invalidations() drop one poll, or all polls when poll_id is None."""
+    await broker.publish(INVALIDATION_CHANNEL, json.dumps({"poll_id": poll_id}))
+
+def _cacheable(value) -> bool:
+    return value is not None and not (isinstance(value, dict) and "error" in value)
+
+def _lookup(key: str):
+    cache = get_cache()
+    if cache is None:
+        return None, None, None
+    return cache, cache.get(key), cache.token(key)
+
+def _read_through(key: str, load):
+    cache, value, token = _lookup(key)
+    if value is not None:
+        return value
+    value = load()
+    if cache is not None and _cacheable(value):
+        cache.set(key, value, token)
+    return value
+
+async def _off_loop(cache, fn, *args):
+    if cache.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+async def _read_through_async(poll_id: int, key: str, load):
+    cache = get_cache()
+    if cache is None:
+        return await load()
+    pending = _pending.get(poll_id)
+    if pending is not None:
+        await asyncio.wrap_future(pending)
+    value = await _off_loop(cache, cache.get, key)
+    if value is not None:
+        return value
+    token = await _off_loop(cache, cache.token, key)
+    value = await load()
+    if _cacheable(value):
+        await _off_loop(cache, cache.set, key, value, token)
+    return value
+
+def get_poll(db: Session, poll_id: int) -> Optional[dict]:
+    return _read_through(poll_key(poll_id), lambda: poll_service.get_poll(db, poll_id))
+
+def get_poll_results(db: Session, poll_id: int) -> dict:
+    return _read_through(results_key(poll_id), lambda: poll_service.get_poll_results(db, poll_id))
+
+def get_poll_versions(db: Session, poll_id: int) -> Optional[dict]:
+    return _read_through(versions_key(poll_id), lambda: poll_service.get_poll_versions(db, poll_id))
+
+async def get_poll_async(db: AsyncSession, poll_id: int) -> Optional[dict]:
+    return await _read_through_async(poll_id, poll_key(poll_id), lambda: async_poll_service.get_poll(db, poll_id))
+
+async def get_poll_results_async(db: AsyncSession, poll_id: int) -> dict:
+    return await _read_through_async(poll_id, results_key(poll_id), lambda: async_poll_service.get_poll_results(db, poll_id))
+
+async def get_poll_versions_async(db: AsyncSession, poll_id: int) -> Optional[dict]:
+    return await _read_through_async(poll_id, versions_key(poll_id), lambda: async_poll_service.get_poll_versions(db, poll_id))
+
+def clear():
+    if _cache is not None:
+        _cache.clear()
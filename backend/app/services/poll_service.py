@@ -1,19 +1,28 @@
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session, selectinload
 from ..models.polls import Poll
+from ..models.poll_option import PollOption
 from ..models.vote import Vote
 from ..models.comment import Comment
 from ..models.like import Like
+from ..models.poll_option_count import PollOptionCount
+from ..db import search
+from ..db.utils import dialect_insert
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils import events
 from ..schemas import poll_schema
-import json
+from sqlalchemy import case, delete, func, insert, literal, select, tuple_, update
 
 def create_poll(db: Session, poll: poll_schema.PollCreate):
     from ..models.user import User
     db_poll = Poll(
         question=poll.question,
-        options=json.dumps(poll.options),
-        creator_id=poll.creator_id
+        creator_id=poll.creator_id,
+        options=[PollOption(position=i, label=label) for i, label in enumerate(poll.options)]
     )
     db.add(db_poll)
+    db.flush()
+    _index_poll(db, db_poll.id, poll.question, poll.options)
     db.commit()
     db.refresh(db_poll)
     
@@ -22,102 +31,352 @@ def create_poll(db: Session, poll: poll_schema.PollCreate):
     return {
         "id": db_poll.id,
         "question": db_poll.question,
-        "options": json.loads(db_poll.options),
+        "options": [option.label for option in db_poll.options],
         "likes": db_poll.likes,
         "username": user.username if user else "Unknown"
     }
 
-def get_polls(db: Session):
+POLL_ORDERINGS = ("id", "likes")
+
+def _poll_to_dict(poll: Poll, username: str):
+    return {
+        "id": poll.id,
+        "question": poll.question,
+        "options": [option.label for option in poll.options],
+        "likes": poll.likes,
+        "username": username
+    }
+
+def _feed_sort_key(order_by: str):
+    if order_by not in POLL_ORDERINGS:
+        raise ValueError(f"Unsupported ordering: {order_by}")
+    if order_by == "likes":
+        return (Poll.likes, Poll.id)
+    return (Poll.id,)
+
+def _feed_after(cursor: str, sort_key):
+    try:
+        after = [int(value) for value in decode_cursor(cursor, len(sort_key))]
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return tuple_(*sort_key) < tuple_(*after)
+
+def _feed_page(rows, limit: int, order_by: str):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1][0]
+        next_cursor = encode_cursor([last.likes, last.id] if order_by == "likes" else [last.id])
+    return {"items": [_poll_to_dict(poll, username) for poll, username in rows], "next_cursor": next_cursor}
+
+def get_polls(db: Session, limit: int = 20, cursor: str = None, order_by: str = "id", creator_id: int = None):
+    """Return one keyset-paginated page of polls, newest (or most liked) first."""
     from ..models.user import User
-    polls = db.query(Poll, User.username).join(User, Poll.creator_id == User.id).all()
-    
-    result = []
-    for poll, username in polls:
-        poll_dict = {
-            "id": poll.id,
-            "question": poll.question,
-            "options": json.loads(poll.options),
-            "likes": poll.likes,
-            "username": username
-        }
-        result.append(poll_dict)
-    return result
+    sort_key = _feed_sort_key(order_by)
+
+    query = (
+        db.query(Poll, User.username)
+        .join(User, Poll.creator_id == User.id)
+        .options(selectinload(Poll.options))
+    )
+    if creator_id is not None:
+        query = query.filter(Poll.creator_id == creator_id)
+
+    if cursor:
+        query = query.filter(_feed_after(cursor, sort_key))
+    polls = query.order_by(*(column.desc() for column in sort_key)).limit(limit + 1).all()
+    return _feed_page(polls, limit, order_by)
+
+def _search_params(poll_id: int, question: str, options) -> dict:
+    return {"poll_id": poll_id, "question": question, "options": " ".join(options)}
+
+def _index_poll(db: Session, poll_id: int, question: str, options):
+    # Same transaction as the poll, so the index never lists a poll that does not exist
+    statement = search.index_statement(db.get_bind().dialect.name)
+    if statement is not None:
+        db.execute(statement, _search_params(poll_id, question, options))
+
+def _search_after(cursor: str):
+    try:
+        rank, poll_id = decode_cursor(cursor, 2)
+        return float(rank), int(poll_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _search_query(db, q: str, limit: int, cursor: str = None):
+    return search.ranked_query(
+        db.get_bind().dialect.name, search.search_terms(q), limit + 1, _search_after(cursor) if cursor else None
+    )
+
+def _polls_by_id(poll_ids):
+    from ..models.user import User
+    return (
+        select(Poll, User.username)
+        .join(User, Poll.creator_id == User.id)
+        .options(selectinload(Poll.options))
+        .where(Poll.id.in_(poll_ids))
+    )
+
+def _search_page(hits, rows, limit: int):
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+    polls = {poll.id: (poll, username) for poll, username in rows}
+    return {
+        # Rank order comes from the index; the poll rows are loaded in one query
+        "items": [_poll_to_dict(*polls[poll_id]) for poll_id, _ in hits if poll_id in polls],
+        "next_cursor": encode_cursor([hits[-1][1], hits[-1][0]]) if has_more else None,
+    }
+
+def search_polls(db: Session, q: str, limit: int = 20, cursor: str = None):
+    """One page of polls whose question or options match q, best match first."""
+    statement, params = _search_query(db, q, limit, cursor)
+    hits = [tuple(hit) for hit in db.execute(statement, params).all()]
+    rows = db.execute(_polls_by_id([poll_id for poll_id, _ in hits[:limit]])).all() if hits else []
+    return _search_page(hits, rows, limit)
+
+def rebuild_search_index(db: Session):
+    """Re-index every poll from the polls and poll_options tables."""
+    for statement in search.rebuild_statements(db.get_bind().dialect.name):
+        db.execute(statement)
+    db.commit()
 
 def get_poll(db: Session, poll_id: int):
     from ..models.user import User
-    result = db.query(Poll, User.username).join(User, Poll.creator_id == User.id).filter(Poll.id == poll_id).first()
+    result = (
+        db.query(Poll, User.username)
+        .join(User, Poll.creator_id == User.id)
+        .options(selectinload(Poll.options))
+        .filter(Poll.id == poll_id)
+        .first()
+    )
     
     if result:
         poll, username = result
-        return {
-            "id": poll.id,
-            "question": poll.question,
-            "options": json.loads(poll.options),
-            "likes": poll.likes,
-            "username": username
-        }
+        return _poll_to_dict(poll, username)
     return None
 
 def vote_on_poll(db: Session, poll_id: int, option: str, user_id: int):
-    # Check if poll exists
-    poll = db.query(Poll).filter(Poll.id == poll_id).first()
-    if not poll:
-        return {"error": "Poll not found"}
+    # Resolve the label and insert in one statement; the unique (poll_id, user_id)
+    # index turns a repeat or racing vote into a no-op instead of a second row
+    option_id = db.execute(_vote_insert(db, poll_id, option, user_id)).scalar()
+    if option_id is None:
+        return _vote_rejection(db, poll_id, option)
     
-    # Check if user already voted
-    existing_vote = db.query(Vote).filter(Vote.poll_id == poll_id, Vote.user_id == user_id).first()
-    if existing_vote:
-        return {"error": "User already voted on this poll"}
-    
-    # Create new vote
-    new_vote = Vote(poll_id=poll_id, option=option, user_id=user_id)
-    db.add(new_vote)
+    count = _increment_option_count(db, poll_id, option_id)
+    db.execute(_bump_version("results", poll_id))
     db.commit()
+    events.publish(events.poll_topic(poll_id), _vote_event(poll_id, option_id, option, count))
     
-    return {"message": "Vote recorded successfully", "poll_id": poll_id, "option": option}
+    return {"message": "Vote recorded successfully", "poll_id": poll_id, "option": option, "option_id": option_id}
+
+VERSIONED_RESOURCES = ("poll", "results", "comments")
+_VERSION_COLUMNS = dict(zip(VERSIONED_RESOURCES, (Poll.version, Poll.results_version, Poll.comments_version)))
+
+def _bump_version(resource: str, *poll_ids: int):
+    column = _VERSION_COLUMNS[resource]
+    return update(Poll).where(Poll.id.in_(poll_ids)).values({column: column + 1})
+
+def _versions_select(poll_id: int):
+    return select(*_VERSION_COLUMNS.values()).where(Poll.id == poll_id)
+
+def _versions_to_dict(row):
+    return dict(zip(VERSIONED_RESOURCES, row)) if row is not None else None
+
+def get_poll_versions(db: Session, poll_id: int):
+    """The poll's change counter per resource ("poll", "results", "comments"), or None if it does not exist."""
+    return _versions_to_dict(db.execute(_versions_select(poll_id)).first())
+
+def _vote_event(poll_id: int, option_id: int, option: str, count: int, delta: int = 1):
+    return {"type": "vote", "poll_id": poll_id, "option_id": option_id, "option": option, "delta": delta, "count": count}
+
+def _like_event(poll_id: int, liked: bool, likes: int, version: int):
+    return {"type": "like", "poll_id": poll_id, "delta": 1 if liked else -1, "likes": likes, "version": version}
+
+def _comment_event(poll_id: int, comment: dict):
+    return {"type": "comment", "poll_id": poll_id, "comment": {**comment, "created_at": comment["created_at"].isoformat()}}
+
+def enqueue_vote(db: Session, queue, poll_id: int, option: str, user_id: int):
+    """Validate a vote and hand it to the write-behind queue instead of inserting it now."""
+    selected = (
+        db.query(PollOption.id)
+        .filter(PollOption.poll_id == poll_id, PollOption.label == option)
+        .order_by(PollOption.position)
+        .first()
+    )
+    if selected is None:
+        return _vote_rejection(db, poll_id, option)
+    if queue.pending_vote(poll_id, user_id) or db.query(Vote.id).filter(Vote.poll_id == poll_id, Vote.user_id == user_id).first():
+        return {"error": "User already voted on this poll"}
+
+    try:
+        queued = queue.submit(poll_id, selected.id, option, user_id)
+    except queue.QueueFullError:
+        # Shed to the synchronous path rather than growing the queue without bound
+        return vote_on_poll(db, poll_id, option, user_id)
+    if not queued:
+        return {"error": "User already voted on this poll"}
+    return {"message": "Vote accepted", "poll_id": poll_id, "option": option, "option_id": selected.id, "queued": True}
+
+def _vote_rejection(db: Session, poll_id: int, option: str):
+    # Only reached when nothing was inserted, so the happy path never pays for these lookups
+    if db.query(Poll.id).filter(Poll.id == poll_id).first() is None:
+        return {"error": "Poll not found"}
+    if db.query(PollOption.id).filter(PollOption.poll_id == poll_id, PollOption.label == option).first() is None:
+        return {"error": "Invalid option"}
+    return {"error": "User already voted on this poll"}
+
+def _vote_insert(db: Session, poll_id: int, option: str, user_id: int):
+    selected = (
+        select(PollOption.poll_id, PollOption.id, literal(user_id))
+        .where(PollOption.poll_id == poll_id, PollOption.label == option)
+        .order_by(PollOption.position)
+        .limit(1)
+    )
+    return (
+        dialect_insert(db, Vote)
+        .from_select(["poll_id", "option_id", "user_id"], selected)
+        .on_conflict_do_nothing(index_elements=[Vote.poll_id, Vote.user_id])
+        .returning(Vote.option_id)
+    )
+
+def _option_count_upsert(db: Session, poll_id: int, option_id: int, amount: int = 1):
+    stmt = dialect_insert(db, PollOptionCount).values(poll_id=poll_id, option_id=option_id, vote_count=amount)
+    return stmt.on_conflict_do_update(
+        index_elements=[PollOptionCount.poll_id, PollOptionCount.option_id],
+        set_={"vote_count": PollOptionCount.vote_count + amount}
+    ).returning(PollOptionCount.vote_count)
+
+def _increment_option_count(db: Session, poll_id: int, option_id: int, amount: int = 1):
+    """Bump the option's tally and return its new value."""
+    return db.execute(_option_count_upsert(db, poll_id, option_id, amount)).scalar()
+
+def rebuild_option_counts(db: Session, poll_id: int = None):
+    """Recompute the maintained tallies from the votes table (all polls when poll_id is None)."""
+    clear = delete(PollOptionCount)
+    tally = select(Vote.poll_id, Vote.option_id, func.count(Vote.id)).where(Vote.poll_id.is_not(None))
+    # The counts may change, so results ETags issued before the rebuild must stop matching
+    bump = update(Poll).values(results_version=Poll.results_version + 1)
+    if poll_id is not None:
+        clear = clear.where(PollOptionCount.poll_id == poll_id)
+        tally = tally.where(Vote.poll_id == poll_id)
+        bump = bump.where(Poll.id == poll_id)
+    tally = tally.group_by(Vote.poll_id, Vote.option_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(PollOptionCount).from_select(["poll_id", "option_id", "vote_count"], tally)
+    )
+    db.execute(bump)
+    db.commit()
+    return result.rowcount
 
 def get_poll_results(db: Session, poll_id: int):
     poll = db.query(Poll).filter(Poll.id == poll_id).first()
     if not poll:
         return {"error": "Poll not found"}
     
-    votes = db.query(Vote).filter(Vote.poll_id == poll_id).all()
-    options = json.loads(poll.options)
-    
-    results = {option: 0 for option in options}
-    for vote in votes:
-        if vote.option in results:
-            results[vote.option] += 1
-    
+    rows = db.execute(_option_tallies(poll_id)).all()
+    return _results_to_dict(poll, rows)
+
+def _option_tallies(poll_id: int):
+    return (
+        select(PollOption.label, func.coalesce(PollOptionCount.vote_count, 0))
+        .outerjoin(PollOptionCount, PollOptionCount.option_id == PollOption.id)
+        .where(PollOption.poll_id == poll_id)
+        .order_by(PollOption.position)
+    )
+
+def _results_to_dict(poll: Poll, rows):
     return {
-        "poll_id": poll_id,
+        "poll_id": poll.id,
         "question": poll.question,
-        "results": results,
-        "total_votes": len(votes),
+        "results": {label: count for label, count in rows},
+        "total_votes": sum(count for _, count in rows),
         "likes": poll.likes
     }
 
+EXPORT_BATCH_SIZE = 1000
+VOTE_EXPORT_COLUMNS = ("vote_id", "poll_id", "option_id", "option", "user_id")
+TALLY_EXPORT_COLUMNS = ("poll_id", "question", "option_id", "option", "votes")
+
+def _vote_export_query(poll_id: int, batch_size: int):
+    return (
+        select(Vote.id, Vote.poll_id, Vote.option_id, PollOption.label, Vote.user_id)
+        .join(PollOption, Vote.option_id == PollOption.id)
+        .where(Vote.poll_id == poll_id)
+        .order_by(Vote.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+def _tally_export_query(batch_size: int):
+    return (
+        select(Poll.id, Poll.question, PollOption.id, PollOption.label, func.coalesce(PollOptionCount.vote_count, 0))
+        .join(PollOption, PollOption.poll_id == Poll.id)
+        .outerjoin(PollOptionCount, PollOptionCount.option_id == PollOption.id)
+        .order_by(Poll.id, PollOption.position)
+        .execution_options(yield_per=batch_size)
+    )
+
+def _row_batches(result):
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+def export_poll_votes(db: Session, poll_id: int, user_id: int, batch_size: int = EXPORT_BATCH_SIZE):
+    """Batches of a poll's votes read through a server-side cursor.
+
+    Rows name each voter, so only the poll's creator gets them; anyone else gets
+    an error dict, and a missing poll gives None.
+    """
+    poll = db.query(Poll.creator_id).filter(Poll.id == poll_id).first()
+    if poll is None:
+        return None
+    if poll.creator_id != user_id:
+        return {"error": "Only the poll's creator can export its votes"}
+    return _row_batches(db.execute(_vote_export_query(poll_id, batch_size)))
+
+def export_tallies(db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+    """Batches of (poll, option, votes) rows for every poll, from the maintained tallies."""
+    return _row_batches(db.execute(_tally_export_query(batch_size)))
+
 def like_poll(db: Session, poll_id: int, user_id: int):
-    # Check if user already liked this poll
-    existing_like = db.query(Like).filter(Like.poll_id == poll_id, Like.user_id == user_id).first()
-    
-    if existing_like:
-        # Unlike: remove like and decrement count
-        db.delete(existing_like)
-        poll = db.query(Poll).filter(Poll.id == poll_id).first()
-        if poll and poll.likes > 0:
-            poll.likes -= 1
-        db.commit()
-        return {"message": "Poll unliked", "liked": False}
-    else:
-        # Like: add like and increment count
-        new_like = Like(poll_id=poll_id, user_id=user_id)
-        db.add(new_like)
-        poll = db.query(Poll).filter(Poll.id == poll_id).first()
-        if poll:
-            poll.likes += 1
-        db.commit()
-        return {"message": "Poll liked", "liked": True}
+    """Toggle the user's like and return the poll's new like count.
+
+    The like row and Poll.likes change in SQL, so concurrent toggles never
+    lose an increment; the unique (poll_id, user_id) constraint decides
+    whether this request likes or unlikes.
+    """
+    liked = db.execute(_like_insert(db, poll_id, user_id)).scalar() is not None
+    if not liked and db.execute(_like_delete(poll_id, user_id)).scalar() is None:
+        # Nothing inserted and nothing to delete: only a missing poll gets here
+        return {"error": "Poll not found"}
+
+    likes, version = db.execute(_likes_update(poll_id, 1 if liked else -1)).one()
+    db.commit()
+    events.publish(events.poll_topic(poll_id), _like_event(poll_id, liked, likes, version))
+    return _like_result(poll_id, liked, likes)
+
+def _like_insert(db: Session, poll_id: int, user_id: int):
+    # Selecting from polls means a like on a missing poll inserts nothing
+    poll = select(Poll.id, literal(user_id)).where(Poll.id == poll_id)
+    return (
+        dialect_insert(db, Like)
+        .from_select(["poll_id", "user_id"], poll)
+        .on_conflict_do_nothing(index_elements=[Like.poll_id, Like.user_id])
+        .returning(Like.id)
+    )
+
+def _like_delete(poll_id: int, user_id: int):
+    return delete(Like).where(Like.poll_id == poll_id, Like.user_id == user_id).returning(Like.id)
+
+def _likes_update(poll_id: int, delta: int):
+    likes = Poll.likes + delta if delta > 0 else case((Poll.likes > 0, Poll.likes + delta), else_=0)
+    return update(Poll).where(Poll.id == poll_id).values(
+        likes=likes, version=Poll.version + 1, results_version=Poll.results_version + 1
+    ).returning(Poll.likes, Poll.version)
+
+def _like_result(poll_id: int, liked: bool, likes: int):
+    return {"message": "Poll liked" if liked else "Poll unliked", "poll_id": poll_id, "liked": liked, "likes": likes}
 
 def add_comment(db: Session, poll_id: int, comment: poll_schema.CommentCreate):
     from ..models.user import User
@@ -127,38 +386,118 @@ def add_comment(db: Session, poll_id: int, comment: poll_schema.CommentCreate):
         user_id=comment.user_id
     )
     db.add(db_comment)
+    db.execute(_bump_version("comments", poll_id))
     db.commit()
     db.refresh(db_comment)
     
     # Get username
     user = db.query(User).filter(User.id == comment.user_id).first()
+    result = _comment_to_dict(db_comment, user.username if user else "Unknown")
+    events.publish(events.poll_topic(poll_id), _comment_event(poll_id, result))
+    return result
+
+def _comment_to_dict(comment: Comment, username: str):
     return {
-        "id": db_comment.id,
-        "content": db_comment.content,
-        "user_id": db_comment.user_id,
-        "username": user.username if user else "Unknown",
-        "created_at": db_comment.created_at
+        "id": comment.id,
+        "content": comment.content,
+        "user_id": comment.user_id,
+        "username": username,
+        "created_at": comment.created_at
     }
 
-def get_comments(db: Session, poll_id: int):
+COMMENT_SORT_KEY = (Comment.created_at, Comment.id)
+
+def _comment_cursor(comment: Comment) -> str:
+    return encode_cursor([comment.created_at.isoformat(), comment.id])
+
+def _decode_comment_cursor(cursor: str):
+    try:
+        created_at, comment_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(created_at), int(comment_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _comments_select(poll_id: int, limit: int, before: str = None, after: str = None, since: datetime = None):
+    """Keyset page over (created_at, id), served by ix_comments_poll_id_created_at_id.
+
+    Pages run newest first, or oldest first when reading forward with `after`
+    so that following next_cursor never skips a comment.
+    """
     from ..models.user import User
-    comments = db.query(Comment, User.username).join(User, Comment.user_id == User.id).filter(Comment.poll_id == poll_id).order_by(Comment.created_at.desc()).all()
-    
-    result = []
-    for comment, username in comments:
-        comment_dict = {
-            "id": comment.id,
-            "content": comment.content,
-            "user_id": comment.user_id,
-            "username": username,
-            "created_at": comment.created_at
-        }
-        result.append(comment_dict)
-    return result
+    if before and after:
+        raise ValueError("Use either before or after, not both")
+    stmt = (
+        select(Comment, User.username)
+        .join(User, Comment.user_id == User.id)
+        .where(Comment.poll_id == poll_id)
+    )
+    if since is not None:
+        if since.tzinfo is not None:
+            # created_at is stored as naive UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        stmt = stmt.where(Comment.created_at > since)
+    if before:
+        stmt = stmt.where(tuple_(*COMMENT_SORT_KEY) < tuple_(*_decode_comment_cursor(before)))
+    if after:
+        stmt = stmt.where(tuple_(*COMMENT_SORT_KEY) > tuple_(*_decode_comment_cursor(after)))
+    order = COMMENT_SORT_KEY if after else tuple(column.desc() for column in COMMENT_SORT_KEY)
+    return stmt.order_by(*order).limit(limit + 1)
+
+def _comments_page(rows, limit: int):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [_comment_to_dict(comment, username) for comment, username in rows],
+        "next_cursor": _comment_cursor(rows[-1][0]) if has_more else None,
+    }
+
+def get_comments(db: Session, poll_id: int, limit: int = 50, before: str = None, after: str = None, since: datetime = None):
+    """Return one page of a poll's comments; pass next_cursor back as the same before/after parameter."""
+    rows = db.execute(_comments_select(poll_id, limit, before, after, since)).all()
+    return _comments_page(rows, limit)
+
+def check_user_voted(db: Session, poll_id: int, user_id: int, queue=None):
+    # A vote still waiting in the write-behind queue counts as cast
+    pending = queue.pending_vote(poll_id, user_id) if queue is not None else None
+    if pending:
+        return {"has_voted": True, "selected_option": pending["option"]}
+    vote = (
+        db.query(PollOption.label)
+        .join(Vote, Vote.option_id == PollOption.id)
+        .filter(Vote.poll_id == poll_id, Vote.user_id == user_id)
+        .first()
+    )
+    return {"has_voted": vote is not None, "selected_option": vote.label if vote else None}
+
+def get_user_poll_statuses(db: Session, poll_ids: list[int], user_id: int, queue=None):
+    """Vote and like status of one user for many polls, from one query per table."""
+    poll_ids = list(dict.fromkeys(poll_ids))
+    votes = dict(db.execute(_user_votes(poll_ids, user_id)).all())
+    liked = set(db.execute(_user_likes(poll_ids, user_id)).scalars())
+    return _poll_statuses(poll_ids, votes, liked, queue, user_id)
+
+def _user_votes(poll_ids: list[int], user_id: int):
+    return (
+        select(Vote.poll_id, PollOption.label)
+        .join(PollOption, Vote.option_id == PollOption.id)
+        .where(Vote.user_id == user_id, Vote.poll_id.in_(poll_ids))
+    )
+
+def _user_likes(poll_ids: list[int], user_id: int):
+    return select(Like.poll_id).where(Like.user_id == user_id, Like.poll_id.in_(poll_ids))
 
-def check_user_voted(db: Session, poll_id: int, user_id: int):
-    vote = db.query(Vote).filter(Vote.poll_id == poll_id, Vote.user_id == user_id).first()
-    return {"has_voted": vote is not None, "selected_option": vote.option if vote else None}
+def _poll_statuses(poll_ids: list[int], votes: dict, liked: set, queue, user_id: int):
+    statuses = []
+    for poll_id in poll_ids:
+        pending = queue.pending_vote(poll_id, user_id) if queue is not None else None
+        selected = pending["option"] if pending else votes.get(poll_id)
+        statuses.append({
+            "poll_id": poll_id,
+            "has_voted": selected is not None,
+            "selected_option": selected,
+            "has_liked": poll_id in liked
+        })
+    return statuses
 
 def check_user_liked(db: Session, poll_id: int, user_id: int):
     like = db.query(Like).filter(Like.poll_id == poll_id, Like.user_id == user_id).first()
@@ -0,0 +1,225 @@
+"""Write-behind vote ingestion.
+
+Votes accepted by the API wait in an in-process queue and a background thread
+inserts them in batches, one transaction per batch, so the database commits
+(and on SQLite, fsyncs) once per batch instead of once per vote. A vote stays
+visible to its author through pending_vote() from submit until its batch has
+committed.
+
+A failed batch goes back to the front of the queue and the next batch is half
+its size, so one bad vote is isolated instead of blocking everything behind
+it. A vote that keeps failing on its own is retried with exponential backoff
+and dropped, with an error log, after max_attempts. stop() keeps retrying for
+up to shutdown_timeout seconds and logs every accepted vote it could not write.
+"""
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db.utils import dialect_insert
+from ..models.vote import Vote
+from ..utils import events
+from .poll_service import _bump_version, _increment_option_count, _vote_event
+
+logger = logging.getLogger(__name__)
+
+class VoteQueue:
+    class QueueFullError(Exception):
+        pass
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = 500,
+                 flush_interval: float = 0.05, max_pending: int = 10000, max_attempts: int = 5,
+                 max_backoff: float = 5.0, shutdown_timeout: float = 10.0):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.stats = {"enqueued": 0, "written": 0, "duplicates": 0, "batches": 0, "failed_batches": 0, "dropped": 0}
+        self._pending: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._inflight: dict = {}
+        # Failed single-vote writes per vote, and in a row across the queue (for backoff)
+        self._attempts: dict = {}
+        self._failures = 0
+        self._batch_limit = max_batch
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, poll_id: int, option_id: int, option: str, user_id: int) -> bool:
+        """Queue a validated vote; False if this user already has one waiting for the poll."""
+        key = (poll_id, user_id)
+        with self._lock:
+            if self._stopping:
+                raise self.QueueFullError("Vote queue is shutting down")
+            if key in self._pending or key in self._inflight:
+                return False
+            if len(self._pending) >= self.max_pending:
+                raise self.QueueFullError("Vote queue is full")
+            self._pending[key] = {"poll_id": poll_id, "option_id": option_id, "option": option, "user_id": user_id}
+            self.stats["enqueued"] += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="vote-writer", daemon=True)
+                self._worker.start()
+            if len(self._pending) >= self.max_batch and not self._failures:
+                self._wakeup.set()
+        return True
+
+    def pending_vote(self, poll_id: int, user_id: int) -> Optional[dict]:
+        key = (poll_id, user_id)
+        with self._lock:
+            return self._pending.get(key) or self._inflight.get(key)
+
+    def flush(self) -> bool:
+        """Write pending votes now, in batches of at most max_batch; False if a batch failed."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+            if not self._flush_batch():
+                return False
+
+    def stop(self) -> list:
+        """Stop accepting votes and write the pending ones; returns (and logs) any that could not be written."""
+        with self._lock:
+            self._stopping = True
+            worker, self._worker = self._worker, None
+        self._wakeup.set()
+        if worker is not None:
+            worker.join()
+        deadline = time.monotonic() + self.shutdown_timeout
+        while not self.flush():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self._retry_delay(), remaining))
+        with self._lock:
+            unwritten, self._pending = list(self._pending.values()), OrderedDict()
+            self.stats["dropped"] += len(unwritten)
+        if unwritten:
+            logger.error("Vote queue stopped with %d accepted votes unwritten: %s", len(unwritten), unwritten)
+        return unwritten
+
+    def _retry_delay(self) -> float:
+        if not self._failures:
+            return self.flush_interval
+        return min(self.max_backoff, self.flush_interval * 2 ** self._failures)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._retry_delay())
+            self._wakeup.clear()
+            self.flush()
+            with self._lock:
+                if self._stopping:
+                    return
+
+    def _flush_batch(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            batch = {}
+            while self._pending and len(batch) < self._batch_limit:
+                key, vote = self._pending.popitem(last=False)
+                batch[key] = vote
+            self._inflight.update(batch)
+        try:
+            written = self._write(list(batch.values()))
+        except Exception:
+            logger.exception("Failed to write a batch of %d votes; will retry", len(batch))
+            with self._lock:
+                self._batch_failed(batch)
+            return False
+        with self._lock:
+            for key in batch:
+                del self._inflight[key]
+                self._attempts.pop(key, None)
+            self._failures = 0
+            self._batch_limit = min(self.max_batch, self._batch_limit * 2)
+            self.stats["batches"] += 1
+            self.stats["written"] += written
+            self.stats["duplicates"] += len(batch) - written
+        return True
+
+    def _batch_failed(self, batch: dict):
+        self.stats["failed_batches"] += 1
+        for key in batch:
+            del self._inflight[key]
+        if len(batch) > 1:
+            # Retry straight away in halves until the failure is down to one vote
+            self._batch_limit = max(1, len(batch) // 2)
+        else:
+            (key, vote), = batch.items()
+            self._failures += 1
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            if self._attempts[key] >= self.max_attempts:
+                del self._attempts[key]
+                self.stats["dropped"] += 1
+                logger.error("Dropping vote %s after %d failed attempts", vote, self.max_attempts)
+                return
+        # Put the batch back at the front, ahead of newer votes
+        self._pending = OrderedDict(list(batch.items()) + list(self._pending.items()))
+
+    def _write(self, votes: list) -> int:
+        labels = {vote["option_id"]: vote["option"] for vote in votes}
+        db = self.session_factory()
+        try:
+            stmt = (
+                dialect_insert(db, Vote)
+                .values([{"poll_id": v["poll_id"], "option_id": v["option_id"], "user_id": v["user_id"]} for v in votes])
+                .on_conflict_do_nothing(index_elements=[Vote.poll_id, Vote.user_id])
+                .returning(Vote.poll_id, Vote.option_id)
+            )
+            inserted = Counter(tuple(row) for row in db.execute(stmt).all())
+            counts = {
+                key: _increment_option_count(db, key[0], key[1], amount)
+                for key, amount in inserted.items()
+            }
+            if inserted:
+                db.execute(_bump_version("results", *{poll_id for poll_id, _ in inserted}))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for (poll_id, option_id), count in counts.items():
+            event = _vote_event(poll_id, option_id, labels[option_id], count, delta=inserted[(poll_id, option_id)])
+            events.publish(events.poll_topic(poll_id), event)
+        return sum(inserted.values())
+
+_vote_queue: Optional[VoteQueue] = None
+_vote_queue_lock = threading.Lock()
+
+def get_vote_queue() -> Optional[VoteQueue]:
+    """Process-wide queue when VOTE_QUEUE_ENABLED is set, otherwise None."""
+    global _vote_queue
+    from ..core.config import settings
+    if not settings.VOTE_QUEUE_ENABLED:
+        return None
+    with _vote_queue_lock:
+        if _vote_queue is None:
+            from ..db.session import SessionLocal
+            _vote_queue = VoteQueue(
+                SessionLocal,
+                max_batch=settings.VOTE_QUEUE_MAX_BATCH,
+                flush_interval=settings.VOTE_QUEUE_FLUSH_INTERVAL_MS / 1000,
+                max_pending=settings.VOTE_QUEUE_MAX_PENDING,
+            )
+        return _vote_queue
+
+def shutdown_vote_queue():
+    """Drain accepted votes to the database; called from the app lifespan on shutdown."""
+    global _vote_queue
+    with _vote_queue_lock:
+        queue, _vote_queue = _vote_queue, None
+    if queue is not None:
+        queue.stop()
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.v1.endpoints import async_auth, async_polls
+from app.db.session import get_async_db
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def async_app(async_session_factory):
+    app = FastAPI()
+    app.include_router(async_auth.router, prefix="/api/v1")
+    app.include_router(async_polls.router, prefix="/api/v1/polls")
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+async def test_async_poll_flow(async_app):
+    async with AsyncClient(transport=ASGITransport(app=async_app), base_url="http://test") as client:
+        await client.post("/api/v1/register", json={"username": "asyncapi", "password": "pw"})
+        login = await client.post("/api/v1/login", json={"username": "asyncapi", "password": "pw"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        created = await client.post("/api/v1/polls/", json={"question": "Async?", "options": ["A", "B"]}, headers=headers)
+        assert created.status_code == 200
+        poll_id = created.json()["id"]
+
+        vote = await client.post(f"/api/v1/polls/{poll_id}/vote", json={"option": "B"}, headers=headers)
+        assert vote.json()["message"] == "Vote recorded successfully"
+
+        results = await client.get(f"/api/v1/polls/{poll_id}/results")
+        assert results.json()["results"] == {"A": 0, "B": 1}
+        repeat = await client.get(f"/api/v1/polls/{poll_id}/results", headers={"If-None-Match": results.headers["ETag"]})
+        assert repeat.status_code == 304
+
+        export = await client.get(f"/api/v1/polls/{poll_id}/votes/export", params={"format": "csv"}, headers=headers)
+        assert export.text.splitlines()[1].split(",")[3] == "B"
+        tallies = await client.get("/api/v1/polls/tallies/export")
+        assert tallies.text.count("\n") == 2
+
+        liked = await client.post(f"/api/v1/polls/{poll_id}/like", headers=headers)
+        assert liked.json()["likes"] == 1
+
+        feed = await client.get("/api/v1/polls/")
+        assert [p["id"] for p in feed.json()] == [poll_id]
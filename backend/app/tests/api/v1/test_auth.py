@@ -44,3 +44,34 @@ def test_login_wrong_password(client, test_user):
     })
     assert response.status_code == 401
     assert "Invalid credentials" in response.json()["detail"]
+
+def test_authenticated_requests_reuse_resolved_user(client):
+    from app.api.deps import principal_cache
+    from app.core.security import decode_token
+    client.post("/api/v1/register", json={"username": "cached_principal", "password": "pw"})
+    token = client.post("/api/v1/login", json={"username": "cached_principal", "password": "pw"}).json()["access_token"]
+    assert decode_token(token)["uid"] is not None
+
+    headers = {"Authorization": f"Bearer {token}"}
+    hits = principal_cache.stats["hits"]
+    for _ in range(3):
+        assert client.get("/api/v1/polls/1/vote-status", headers=headers).status_code == 200
+    assert principal_cache.stats["hits"] == hits + 2
+
+def test_tokens_without_uid_still_resolve(client):
+    from app.services.auth_service import create_user_token
+    client.post("/api/v1/register", json={"username": "legacy_token", "password": "pw"})
+    headers = {"Authorization": f"Bearer {create_user_token('legacy_token')}"}
+    assert client.get("/api/v1/polls/1/like-status", headers=headers).status_code == 200
+
+def test_invalidated_principal_is_looked_up_again(client):
+    from app.api.deps import invalidate_principal, principal_cache
+    client.post("/api/v1/register", json={"username": "invalidated", "password": "pw"})
+    login = client.post("/api/v1/login", json={"username": "invalidated", "password": "pw"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    client.get("/api/v1/polls/1/like-status", headers=headers)
+
+    invalidate_principal(login["user"]["id"], "invalidated")
+    misses = principal_cache.stats["misses"]
+    client.get("/api/v1/polls/1/like-status", headers=headers)
+    assert principal_cache.stats["misses"] == misses + 1
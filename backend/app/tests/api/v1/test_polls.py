@@ -105,6 +105,56 @@ def test_like_poll(client, test_poll, auth_headers):
     )
     assert response.status_code == 200
 
+def test_bulk_poll_status(client):
+    client.post("/api/v1/register", json={"username": "bulk_status", "password": "pw"})
+    token = client.post("/api/v1/login", json={"username": "bulk_status", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.post("/api/v1/polls/", json={"question": "Bulk 1?", "options": ["A", "B"]}, headers=headers).json()["id"]
+    second = client.post("/api/v1/polls/", json={"question": "Bulk 2?", "options": ["A", "B"]}, headers=headers).json()["id"]
+    client.post(f"/api/v1/polls/{first}/vote", json={"option": "B"}, headers=headers)
+    client.post(f"/api/v1/polls/{second}/like", headers=headers)
+
+    response = client.get("/api/v1/polls/status", params={"ids": [first, second]}, headers=headers)
+    assert response.status_code == 200
+    assert [(s["has_voted"], s["selected_option"], s["has_liked"]) for s in response.json()] == [(True, "B", False), (False, None, True)]
+
+    assert client.get("/api/v1/polls/status", headers=headers).status_code == 422
+
+def test_export_votes_streams_csv_and_ndjson(client):
+    import json
+    client.post("/api/v1/register", json={"username": "exporter", "password": "pw"})
+    token = client.post("/api/v1/login", json={"username": "exporter", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    poll_id = client.post("/api/v1/polls/", json={"question": "Export?", "options": ["A", "B"]}, headers=headers).json()["id"]
+    client.post(f"/api/v1/polls/{poll_id}/vote", json={"option": "B"}, headers=headers)
+
+    response = client.get(f"/api/v1/polls/{poll_id}/votes/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "vote_id,poll_id,option_id,option,user_id"
+    assert lines[1].split(",")[3] == "B"
+
+    response = client.get(f"/api/v1/polls/{poll_id}/votes/export", headers=headers)
+    assert [json.loads(line)["option"] for line in response.text.splitlines()] == ["B"]
+
+    tallies = client.get("/api/v1/polls/tallies/export")
+    rows = [json.loads(line) for line in tallies.text.splitlines()]
+    assert [(r["option"], r["votes"]) for r in rows if r["poll_id"] == poll_id] == [("A", 0), ("B", 1)]
+
+    assert client.get("/api/v1/polls/999999/votes/export", headers=headers).status_code == 404
+
+    client.post("/api/v1/register", json={"username": "snooper", "password": "pw"})
+    other = client.post("/api/v1/login", json={"username": "snooper", "password": "pw"}).json()["access_token"]
+    response = client.get(f"/api/v1/polls/{poll_id}/votes/export", headers={"Authorization": f"Bearer {other}"})
+    assert response.status_code == 403
+
+def test_like_missing_poll(client):
+    client.post("/api/v1/register", json={"username": "like_missing", "password": "pw"})
+    token = client.post("/api/v1/login", json={"username": "like_missing", "password": "pw"}).json()["access_token"]
+    response = client.post("/api/v1/polls/999999/like", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
 def test_like_poll_unauthorized(client, test_poll):
     response = client.post(f"/api/v1/polls/{test_poll.id}/like")
     assert response.status_code == 401
@@ -114,3 +164,108 @@ def test_get_poll_likes(client, test_poll):
     assert response.status_code == 200
     data = response.json()
     assert "likes" in data
+
+def test_get_polls_paginated(client):
+    client.post("/api/v1/register", json={"username": "feeduser", "password": "feedpass"})
+    login = client.post("/api/v1/login", json={"username": "feeduser", "password": "feedpass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    for i in range(3):
+        client.post("/api/v1/polls/", json={"question": f"Feed {i}?", "options": ["A", "B"]}, headers=headers)
+
+    params = {"limit": 2, "creator_id": login["user"]["id"]}
+    first = client.get("/api/v1/polls/", params=params)
+    assert first.status_code == 200
+    assert [p["question"] for p in first.json()] == ["Feed 2?", "Feed 1?"]
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/v1/polls/", params={**params, "cursor": cursor})
+    assert [p["question"] for p in second.json()] == ["Feed 0?"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_get_comments_paginated(client):
+    client.post("/api/v1/register", json={"username": "commentpager", "password": "commentpass"})
+    login = client.post("/api/v1/login", json={"username": "commentpager", "password": "commentpass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    poll = client.post("/api/v1/polls/", json={"question": "Paged comments?", "options": ["A", "B"]}, headers=headers).json()
+    for i in range(3):
+        client.post(f"/api/v1/polls/{poll['id']}/comments", json={"content": f"Comment {i}"}, headers=headers)
+
+    first = client.get(f"/api/v1/polls/{poll['id']}/comments", params={"limit": 2})
+    assert [c["content"] for c in first.json()] == ["Comment 2", "Comment 1"]
+
+    second = client.get(f"/api/v1/polls/{poll['id']}/comments", params={"limit": 2, "before": first.headers["X-Next-Cursor"]})
+    assert [c["content"] for c in second.json()] == ["Comment 0"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_get_comments_invalid_cursor(client, test_poll):
+    response = client.get(f"/api/v1/polls/{test_poll.id}/comments", params={"after": "garbage"})
+    assert response.status_code == 400
+
+def test_conditional_get(client):
+    client.post("/api/v1/register", json={"username": "etaguser", "password": "etagpass"})
+    login = client.post("/api/v1/login", json={"username": "etaguser", "password": "etagpass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    poll = client.post("/api/v1/polls/", json={"question": "Tagged?", "options": ["A", "B"]}, headers=headers).json()
+
+    for path in ("", "/results", "/comments"):
+        url = f"/api/v1/polls/{poll['id']}{path}"
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"].startswith("public")
+        repeat = client.get(url, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+
+    results = client.get(f"/api/v1/polls/{poll['id']}/results")
+    comments = client.get(f"/api/v1/polls/{poll['id']}/comments")
+    client.post(f"/api/v1/polls/{poll['id']}/vote", json={"option": "A"}, headers=headers)
+    changed = client.get(f"/api/v1/polls/{poll['id']}/results", headers={"If-None-Match": results.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["results"] == {"A": 1, "B": 0}
+    assert changed.headers["ETag"] != results.headers["ETag"]
+    # Each read has its own tag, so a vote leaves the comments tag alone
+    unchanged = client.get(f"/api/v1/polls/{poll['id']}/comments", headers={"If-None-Match": comments.headers["ETag"]})
+    assert unchanged.status_code == 304
+
+def test_fast_json_responses_match(client, monkeypatch):
+    from app.core.config import settings
+    client.post("/api/v1/register", json={"username": "fastjson", "password": "fastpass"})
+    login = client.post("/api/v1/login", json={"username": "fastjson", "password": "fastpass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    poll = client.post("/api/v1/polls/", json={"question": "Fast?", "options": ["A", "B"]}, headers=headers).json()
+    client.post(f"/api/v1/polls/{poll['id']}/comments", json={"content": "Quick"}, headers=headers)
+
+    urls = [("/api/v1/polls/", {"creator_id": login["user"]["id"]}), (f"/api/v1/polls/{poll['id']}/comments", {})]
+    validated = [client.get(url, params=params) for url, params in urls]
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = [client.get(url, params=params) for url, params in urls]
+    assert [r.json() for r in fast] == [r.json() for r in validated]
+    assert fast[1].headers["ETag"] == validated[1].headers["ETag"]
+
+def test_like_spam_is_rate_limited(client):
+    client.post("/api/v1/register", json={"username": "likespammer", "password": "spampass"})
+    login = client.post("/api/v1/login", json={"username": "likespammer", "password": "spampass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    poll = client.post("/api/v1/polls/", json={"question": "Spam?", "options": ["A", "B"]}, headers=headers).json()
+
+    statuses = [client.post(f"/api/v1/polls/{poll['id']}/like", headers=headers).status_code for _ in range(30)]
+    assert statuses[0] == 200
+    assert 429 in statuses
+    # Other users are unaffected
+    assert client.post(f"/api/v1/polls/{poll['id']}/like").status_code != 429
+
+def test_search_polls(client):
+    client.post("/api/v1/register", json={"username": "searcher", "password": "searchpass"})
+    login = client.post("/api/v1/login", json={"username": "searcher", "password": "searchpass"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    poll = client.post("/api/v1/polls/", json={"question": "Which zeppelin flies best?", "options": ["Hindenburg", "Graf"]}, headers=headers).json()
+
+    response = client.get("/api/v1/polls/search", params={"q": "zeppelin"})
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == [poll["id"]]
+    assert response.json()[0]["options"] == ["Hindenburg", "Graf"]
+    assert client.get("/api/v1/polls/search", params={"q": "!!"}).status_code == 400
+
+def test_get_polls_invalid_cursor(client):
+    response = client.get("/api/v1/polls/", params={"cursor": "garbage"})
+    assert response.status_code == 400
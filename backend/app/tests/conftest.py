@@ -1,12 +1,16 @@
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-import hashlib
 
-from ..main import app
-from ..db.session import get_db, Base
+from ..main import app, rate_limiter
+from ..db.session import get_db, Base, create_async_session_factory
+from ..services import poll_cache
+from ..api.deps import principal_cache
+from ..core.hashing import PasswordHasher, set_password_hasher
+from ..core.security import get_password_hash
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -26,12 +30,26 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Minimum bcrypt cost keeps register/login fast in tests
+set_password_hasher(PasswordHasher(rounds=4, workers=2))
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Poll and user ids (and so rate limit buckets) are reused once a test's rows are rolled back
+    poll_cache.clear()
+    principal_cache.clear()
+    if rate_limiter is not None:
+        rate_limiter.clear()
+    yield
+    poll_cache.clear()
+    principal_cache.clear()
+
 @pytest.fixture
 def db_session():
     connection = engine.connect()
@@ -49,8 +67,8 @@ def client():
 @pytest.fixture
 def test_user(db_session):
     from ..models.user import User
-    # Use SHA256 for tests to avoid bcrypt issues
-    password_hash = hashlib.sha256("testpass".encode()).hexdigest()
+    # Already at the test cost, so logging in never rewrites the row
+    password_hash = get_password_hash("testpass")
     user = User(username="testuser", password=password_hash)
     db_session.add(user)
     db_session.commit()
@@ -66,12 +84,28 @@ def auth_headers(client, test_user):
 @pytest.fixture
 def test_poll(db_session, test_user):
     from ..models.polls import Poll
+    from ..models.poll_option import PollOption
     poll = Poll(
         question="Test poll?",
-        options='["Option 1", "Option 2"]',
+        options=[PollOption(position=0, label="Option 1"), PollOption(position=1, label="Option 2")],
         creator_id=test_user.id
     )
     db_session.add(poll)
     db_session.commit()
     db_session.refresh(poll)
     return poll
+
+@pytest_asyncio.fixture
+async def async_session_factory():
+    # Fresh in-memory database per test for the AsyncSession code path
+    factory = create_async_session_factory("sqlite://", poolclass=StaticPool)
+    async_engine = factory.kw["bind"]
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield factory
+    await async_engine.dispose()
+
+@pytest_asyncio.fixture
+async def async_db(async_session_factory):
+    async with async_session_factory() as session:
+        yield session
@@ -80,3 +80,23 @@ def test_websocket_endpoint(client):
         websocket.send_text("test message")
         # WebSocket should accept the connection
         assert True  # If we get here, connection was successful
+
+def test_websocket_receives_poll_events(client):
+    client.post("/api/v1/register", json={"username": "wsuser", "password": "wspass"})
+    token = client.post("/api/v1/login", json={"username": "wsuser", "password": "wspass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    poll_id = client.post("/api/v1/polls/", json={"question": "Live?", "options": ["Yes", "No"]}, headers=headers).json()["id"]
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_text(json.dumps({"action": "subscribe", "topic": f"poll:{poll_id}"}))
+        assert websocket.receive_json() == {"type": "subscribed", "topic": f"poll:{poll_id}"}
+
+        client.post(f"/api/v1/polls/{poll_id}/vote", json={"option": "No"}, headers=headers)
+        # Votes are folded into a per-window tally message
+        event = websocket.receive_json()
+        assert event == {"type": "tally", "poll_id": poll_id, "merged": 1, "results": {"No": 1}}
+
+def test_websocket_rejects_malformed_requests(client):
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_text("not json")
+        assert websocket.receive_json()["type"] == "error"
@@ -0,0 +1,99 @@
+import pytest
+
+from app.services import async_poll_service, async_auth_service
+from app.schemas.poll_schema import PollCreate, CommentCreate
+from app.schemas.auth_schema import UserCreate
+
+pytestmark = pytest.mark.asyncio
+
+async def _seed(async_db):
+    user = await async_auth_service.create_user(async_db, UserCreate(username="asyncuser", password="asyncpass"))
+    poll = await async_poll_service.create_poll(
+        async_db, PollCreate(question="Async?", options=["Yes", "No"], creator_id=user.id)
+    )
+    return user, poll
+
+async def test_create_and_get_poll(async_db):
+    user, poll = await _seed(async_db)
+    assert poll["options"] == ["Yes", "No"]
+    assert poll["username"] == "asyncuser"
+
+    fetched = await async_poll_service.get_poll(async_db, poll["id"])
+    assert fetched == poll
+
+async def test_get_polls_page(async_db):
+    user, poll = await _seed(async_db)
+    page = await async_poll_service.get_polls(async_db, limit=10)
+    assert [p["id"] for p in page["items"]] == [poll["id"]]
+    assert page["next_cursor"] is None
+
+async def test_vote_and_results(async_db):
+    user, poll = await _seed(async_db)
+    result = await async_poll_service.vote_on_poll(async_db, poll["id"], "No", user.id)
+    assert result["message"] == "Vote recorded successfully"
+
+    again = await async_poll_service.vote_on_poll(async_db, poll["id"], "Yes", user.id)
+    assert again == {"error": "User already voted on this poll"}
+
+    results = await async_poll_service.get_poll_results(async_db, poll["id"])
+    assert results["results"] == {"Yes": 0, "No": 1}
+    status = await async_poll_service.check_user_voted(async_db, poll["id"], user.id)
+    assert status == {"has_voted": True, "selected_option": "No"}
+
+async def test_like_toggle(async_db):
+    user, poll = await _seed(async_db)
+    assert (await async_poll_service.like_poll(async_db, poll["id"], user.id))["liked"] is True
+    assert (await async_poll_service.check_user_liked(async_db, poll["id"], user.id)) == {"has_liked": True}
+    assert await async_poll_service.get_poll_likes(async_db, poll["id"]) == [{"username": "asyncuser"}]
+    unliked = await async_poll_service.like_poll(async_db, poll["id"], user.id)
+    assert (unliked["liked"], unliked["likes"]) == (False, 0)
+    assert (await async_poll_service.get_poll(async_db, poll["id"]))["likes"] == 0
+
+async def test_user_poll_statuses(async_db):
+    user, poll = await _seed(async_db)
+    await async_poll_service.vote_on_poll(async_db, poll["id"], "Yes", user.id)
+    await async_poll_service.like_poll(async_db, poll["id"], user.id)
+    statuses = await async_poll_service.get_user_poll_statuses(async_db, [poll["id"], 999], user.id)
+    assert statuses == [
+        {"poll_id": poll["id"], "has_voted": True, "selected_option": "Yes", "has_liked": True},
+        {"poll_id": 999, "has_voted": False, "selected_option": None, "has_liked": False},
+    ]
+
+async def test_search_polls(async_db):
+    user, poll = await _seed(async_db)
+    page = await async_poll_service.search_polls(async_db, "async")
+    assert [p["id"] for p in page["items"]] == [poll["id"]]
+    assert page["next_cursor"] is None
+
+async def test_comments(async_db):
+    user, poll = await _seed(async_db)
+    comment = await async_poll_service.add_comment(async_db, poll["id"], CommentCreate(content="Hi", user_id=user.id))
+    assert comment["username"] == "asyncuser"
+    second = await async_poll_service.add_comment(async_db, poll["id"], CommentCreate(content="There", user_id=user.id))
+    page = await async_poll_service.get_comments(async_db, poll["id"], limit=1)
+    assert [c["content"] for c in page["items"]] == ["There"]
+    older = await async_poll_service.get_comments(async_db, poll["id"], before=page["next_cursor"])
+    assert [c["content"] for c in older["items"]] == ["Hi"]
+    assert older["next_cursor"] is None
+    newer = await async_poll_service.get_comments(async_db, poll["id"], since=second["created_at"])
+    assert newer["items"] == []
+
+async def test_authenticate_user(async_db):
+    await async_auth_service.create_user(async_db, UserCreate(username="asyncuser", password="asyncpass"))
+    assert await async_auth_service.create_user(async_db, UserCreate(username="asyncuser", password="x")) is None
+    assert (await async_auth_service.authenticate_user(async_db, "asyncuser", "asyncpass")).username == "asyncuser"
+    assert await async_auth_service.authenticate_user(async_db, "asyncuser", "wrong") is None
+
+async def test_unknown_username_still_verifies_a_password(async_db, monkeypatch):
+    from app.core.hashing import get_password_hasher
+    hasher = get_password_hasher()
+    verified = []
+    verify_async = hasher.verify_async
+
+    async def recording_verify(password, hashed):
+        verified.append(hashed)
+        return await verify_async(password, hashed)
+
+    monkeypatch.setattr(hasher, "verify_async", recording_verify)
+    assert await async_auth_service.authenticate_user(async_db, "nobody", "password") is None
+    assert verified == [await hasher.dummy_hash_async()]
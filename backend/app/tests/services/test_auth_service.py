@@ -31,8 +31,31 @@ def test_authenticate_user_nonexistent(db_session):
     user = authenticate_user(db_session, "nonexistent", "password")
     assert user is None
 
+def test_unknown_username_still_verifies_a_password(db_session, monkeypatch):
+    from app.core.hashing import get_password_hasher
+    hasher = get_password_hasher()
+    verified = []
+    verify = hasher.verify
+    monkeypatch.setattr(hasher, "verify", lambda password, hashed: verified.append(hashed) or verify(password, hashed))
+
+    assert authenticate_user(db_session, "nonexistent", "password") is None
+    assert verified == [hasher.dummy_hash()]
+    assert verified[0].startswith(f"$2b${hasher.rounds:02d}$")
+
 def test_create_user_token():
     token = create_user_token("testuser")
     assert token is not None
     assert isinstance(token, str)
     assert len(token) > 0
+
+def test_login_upgrades_legacy_sha256_hash(db_session):
+    import hashlib
+    from app.models.user import User
+    user = User(username="legacyhash", password=hashlib.sha256(b"oldpass").hexdigest())
+    db_session.add(user)
+    db_session.commit()
+
+    assert authenticate_user(db_session, "legacyhash", "oldpass") is not None
+    db_session.refresh(user)
+    assert user.password.startswith("$2b$")
+    assert authenticate_user(db_session, "legacyhash", "oldpass") is not None
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import pytest
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services import async_auth_service, async_poll_service, poll_cache, poll_service
+from app.schemas.auth_schema import UserCreate
+from app.schemas.poll_schema import CommentCreate, PollCreate
+from app.utils import events
+from app.utils.cache import TTLCache
+from app.utils.pubsub import InMemoryBroker
+from app.utils.websocket_manager import ConnectionManager
+
+def test_reads_are_served_from_cache(db_session, test_poll):
+    cache = poll_cache.get_cache()
+    hits = cache.stats["hits"]
+    first = poll_cache.get_poll(db_session, test_poll.id)
+    assert poll_cache.get_poll(db_session, test_poll.id) == first
+    assert cache.stats["hits"] == hits + 1
+
+def test_vote_invalidates_results(db_session, test_poll, test_user):
+    assert poll_cache.get_poll_results(db_session, test_poll.id)["total_votes"] == 0
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", test_user.id)
+    assert poll_cache.get_poll_results(db_session, test_poll.id)["results"] == {"Option 1": 1, "Option 2": 0}
+
+def test_like_and_comment_invalidate_poll(db_session, test_poll, test_user):
+    assert poll_cache.get_poll(db_session, test_poll.id)["likes"] == 0
+    poll_service.like_poll(db_session, test_poll.id, test_user.id)
+    assert poll_cache.get_poll(db_session, test_poll.id)["likes"] == 1
+
+    invalidations = poll_cache.get_cache().stats["invalidations"]
+    poll_service.add_comment(db_session, test_poll.id, CommentCreate(content="Cached?", user_id=test_user.id))
+    assert poll_cache.get_cache().stats["invalidations"] == invalidations + 3
+
+def test_writes_bump_only_the_versions_they_change(db_session, test_poll, test_user):
+    assert poll_cache.get_poll_versions(db_session, test_poll.id) == {"poll": 0, "results": 0, "comments": 0}
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", test_user.id)
+    assert poll_cache.get_poll_versions(db_session, test_poll.id) == {"poll": 0, "results": 1, "comments": 0}
+    poll_service.like_poll(db_session, test_poll.id, test_user.id)
+    assert poll_cache.get_poll_versions(db_session, test_poll.id) == {"poll": 1, "results": 2, "comments": 0}
+    poll_service.add_comment(db_session, test_poll.id, CommentCreate(content="Versioned", user_id=test_user.id))
+    assert poll_cache.get_poll_versions(db_session, test_poll.id) == {"poll": 1, "results": 2, "comments": 1}
+
+def test_rebuilt_tallies_get_a_new_results_version(db_session, test_poll, test_user):
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", test_user.id)
+    assert poll_cache.get_poll_results(db_session, test_poll.id)["total_votes"] == 1
+    poll_service.rebuild_option_counts(db_session, test_poll.id)
+    assert poll_service.get_poll_versions(db_session, test_poll.id)["results"] == 2
+    poll_cache.invalidate_all()
+    assert poll_cache.get_poll_versions(db_session, test_poll.id)["results"] == 2
+
+def test_missing_polls_are_not_cached(db_session):
+    sets = poll_cache.get_cache().stats["sets"]
+    assert poll_cache.get_poll(db_session, 999999) is None
+    assert poll_cache.get_poll_results(db_session, 999999) == {"error": "Poll not found"}
+    assert poll_cache.get_poll_versions(db_session, 999999) is None
+    assert poll_cache.get_cache().stats["sets"] == sets
+
+@pytest.mark.asyncio
+async def test_invalidations_are_relayed_through_the_broker(db_session, test_poll):
+    manager = ConnectionManager(InMemoryBroker())
+    await manager.start()
+    relayed = []
+
+    async def capture(channel, data):
+        relayed.append((channel, json.loads(data)))
+
+    await manager.broker.subscribe(capture)
+    listener = poll_cache.relay_invalidations(manager)
+    try:
+        poll_cache.get_poll(db_session, test_poll.id)
+        assert poll_cache.get_cache().get(poll_cache.poll_key(test_poll.id)) is not None
+        # A write handled by another worker only reaches this one through the broker
+        await manager.broker.publish(poll_cache.INVALIDATION_CHANNEL, json.dumps({"poll_id": test_poll.id}))
+        assert poll_cache.get_cache().get(poll_cache.poll_key(test_poll.id)) is None
+
+        # A complete event: the app's own listeners (the coalescer) see it too
+        events.publish(events.poll_topic(test_poll.id), {"type": "like", "poll_id": test_poll.id, "delta": 1, "likes": 1, "version": 1})
+        await asyncio.sleep(0)
+        assert (poll_cache.INVALIDATION_CHANNEL, {"poll_id": test_poll.id}) in relayed
+    finally:
+        events.remove_listener(listener)
+        await manager.stop()
+
+@pytest.mark.asyncio
+async def test_broadcast_invalidation_drops_every_poll(db_session, test_poll):
+    manager = ConnectionManager(InMemoryBroker())
+    await manager.start()
+    listener = poll_cache.relay_invalidations(manager)
+    try:
+        poll_cache.get_poll(db_session, test_poll.id)
+        await poll_cache.broadcast_invalidation(manager.broker)
+        assert poll_cache.get_cache().get(poll_cache.poll_key(test_poll.id)) is None
+    finally:
+        events.remove_listener(listener)
+        await manager.stop()
+
+class SlowCache(TTLCache):
+    """Stands in for Redis: every call blocks its thread for a round trip."""
+
+    blocking = True
+    delay = 0.1
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return super().get(key)
+
+    def token(self, key):
+        time.sleep(self.delay)
+        return super().token(key)
+
+    def set(self, key, value, token):
+        time.sleep(self.delay)
+        return super().set(key, value, token)
+
+    def invalidate(self, key):
+        time.sleep(self.delay)
+        super().invalidate(key)
+
+@pytest.mark.asyncio
+async def test_slow_cache_does_not_block_the_event_loop(async_db, monkeypatch):
+    poll_cache.get_cache()  # registers the invalidation listener
+    monkeypatch.setattr(poll_cache, "_cache", SlowCache())
+    user = await async_auth_service.create_user(async_db, UserCreate(username="slowcache", password="slowpass"))
+    poll = await async_poll_service.create_poll(
+        async_db, PollCreate(question="Slow?", options=["Yes", "No"], creator_id=user.id)
+    )
+    longest_stall = 0.0
+
+    async def tick():
+        nonlocal longest_stall
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(0.005)
+            longest_stall = max(longest_stall, time.monotonic() - started)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        assert (await poll_cache.get_poll_async(async_db, poll["id"]))["likes"] == 0
+        await async_poll_service.like_poll(async_db, poll["id"], user.id)
+        # Waits for the invalidation still running in the background
+        assert (await poll_cache.get_poll_async(async_db, poll["id"]))["likes"] == 1
+    finally:
+        ticker.cancel()
+    assert longest_stall < SlowCache.delay / 2
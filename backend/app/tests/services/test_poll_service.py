@@ -1,10 +1,12 @@
 import pytest
 import json
+from datetime import datetime, timedelta
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.services import poll_service
+from app.utils.pagination import encode_cursor
 from app.schemas.poll_schema import PollCreate, CommentCreate
 
 def test_create_poll(db_session, test_user):
@@ -43,8 +45,56 @@ def test_add_comment(db_session, test_poll, test_user):
     assert comment.content == "Great poll!"
 
 def test_get_comments(db_session, test_poll):
-    comments = poll_service.get_comments(db_session, test_poll.id)
-    assert isinstance(comments, list)
+    page = poll_service.get_comments(db_session, test_poll.id)
+    assert isinstance(page["items"], list)
+    assert page["next_cursor"] is None
+
+def _seed_comments(db_session, poll, user, count):
+    from app.models.comment import Comment
+    start = datetime(2025, 1, 1, 12, 0)
+    # Pairs share a timestamp, so pages have to break ties on id
+    comments = [
+        Comment(poll_id=poll.id, user_id=user.id, content=f"c{i}", created_at=start + timedelta(minutes=i // 2))
+        for i in range(count)
+    ]
+    db_session.add_all(comments)
+    db_session.flush()
+    return start
+
+def test_get_comments_keyset_pages(db_session, test_poll, test_user):
+    _seed_comments(db_session, test_poll, test_user, 5)
+
+    contents = []
+    cursor = None
+    while True:
+        page = poll_service.get_comments(db_session, test_poll.id, limit=2, before=cursor)
+        contents.append([c["content"] for c in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert contents == [["c4", "c3"], ["c2", "c1"], ["c0"]]
+
+def test_get_comments_after_and_since(db_session, test_poll, test_user):
+    start = _seed_comments(db_session, test_poll, test_user, 5)
+    first = poll_service.get_comments(db_session, test_poll.id, limit=3)
+    assert [c["content"] for c in first["items"]] == ["c4", "c3", "c2"]
+
+    # Reading forward from the end of the first page returns newer comments, oldest first
+    newer = poll_service.get_comments(db_session, test_poll.id, limit=1, after=first["next_cursor"])
+    assert [c["content"] for c in newer["items"]] == ["c3"]
+    rest = poll_service.get_comments(db_session, test_poll.id, after=newer["next_cursor"])
+    assert [c["content"] for c in rest["items"]] == ["c4"]
+    assert rest["next_cursor"] is None
+
+    since = poll_service.get_comments(db_session, test_poll.id, since=start + timedelta(minutes=1))
+    assert [c["content"] for c in since["items"]] == ["c4"]
+
+def test_get_comments_invalid_cursor(db_session, test_poll):
+    with pytest.raises(ValueError):
+        poll_service.get_comments(db_session, test_poll.id, before="garbage")
+    cursor = encode_cursor(["2025-01-01T00:00:00", 1])
+    with pytest.raises(ValueError):
+        poll_service.get_comments(db_session, test_poll.id, before=cursor, after=cursor)
 
 def test_check_user_voted(db_session, test_poll, test_user):
     result = poll_service.check_user_voted(db_session, test_poll.id, test_user.id)
@@ -61,3 +111,209 @@ def test_like_poll(db_session, test_poll, test_user):
 def test_get_poll_likes(db_session, test_poll):
     result = poll_service.get_poll_likes(db_session, test_poll.id)
     assert "likes" in result
+
+def _make_users(db_session, count):
+    from app.models.user import User
+    users = [User(username=f"tally_voter_{i}", password="x") for i in range(count)]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+def test_poll_results_use_maintained_tallies(db_session, test_poll):
+    voters = _make_users(db_session, 3)
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", voters[0].id)
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", voters[1].id)
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 2", voters[2].id)
+
+    results = poll_service.get_poll_results(db_session, test_poll.id)
+    assert results["results"] == {"Option 1": 2, "Option 2": 1}
+    assert results["total_votes"] == 3
+
+def test_rebuild_option_counts(db_session, test_poll):
+    from app.models.vote import Vote
+    from app.models.poll_option_count import PollOptionCount
+    voters = _make_users(db_session, 2)
+    # Votes written without going through the service leave the tallies stale
+    option_2 = test_poll.options[1]
+    db_session.add_all([Vote(poll_id=test_poll.id, option_id=option_2.id, user_id=v.id) for v in voters])
+    db_session.commit()
+    assert poll_service.get_poll_results(db_session, test_poll.id)["total_votes"] == 0
+
+    poll_service.rebuild_option_counts(db_session, test_poll.id)
+    results = poll_service.get_poll_results(db_session, test_poll.id)
+    assert results["results"] == {"Option 1": 0, "Option 2": 2}
+    assert db_session.query(PollOptionCount).filter(PollOptionCount.poll_id == test_poll.id).count() == 1
+
+def _make_polls(db_session, creator, likes):
+    from app.models.polls import Poll
+    from app.models.poll_option import PollOption
+    polls = [
+        Poll(question=f"Feed poll {i}?", options=[PollOption(position=0, label="A")], creator_id=creator.id, likes=n)
+        for i, n in enumerate(likes)
+    ]
+    db_session.add_all(polls)
+    db_session.commit()
+    return polls
+
+def test_get_polls_keyset_pagination(db_session, test_user):
+    polls = _make_polls(db_session, test_user, [0, 0, 0])
+    first = poll_service.get_polls(db_session, limit=2, creator_id=test_user.id)
+    assert [p["id"] for p in first["items"]] == [polls[2].id, polls[1].id]
+    assert first["next_cursor"] is not None
+
+    second = poll_service.get_polls(db_session, limit=2, cursor=first["next_cursor"], creator_id=test_user.id)
+    assert [p["id"] for p in second["items"]] == [polls[0].id]
+    assert second["next_cursor"] is None
+
+def test_get_polls_ordered_by_likes(db_session, test_user):
+    polls = _make_polls(db_session, test_user, [5, 9, 5])
+    first = poll_service.get_polls(db_session, limit=2, order_by="likes", creator_id=test_user.id)
+    assert [p["id"] for p in first["items"]] == [polls[1].id, polls[2].id]
+
+    second = poll_service.get_polls(db_session, limit=2, order_by="likes", cursor=first["next_cursor"], creator_id=test_user.id)
+    assert [p["id"] for p in second["items"]] == [polls[0].id]
+
+def test_get_polls_invalid_cursor(db_session):
+    with pytest.raises(ValueError):
+        poll_service.get_polls(db_session, cursor="not-a-cursor")
+
+def test_vote_on_poll_invalid_option(db_session, test_poll, test_user):
+    result = poll_service.vote_on_poll(db_session, test_poll.id, "Option 3", test_user.id)
+    assert result == {"error": "Invalid option"}
+
+def test_vote_on_missing_poll(db_session, test_user):
+    result = poll_service.vote_on_poll(db_session, 999999, "Option 1", test_user.id)
+    assert result == {"error": "Poll not found"}
+
+def test_poll_options_keep_their_order(db_session, test_user):
+    poll_data = PollCreate(question="Order?", options=["C", "A", "B"], creator_id=test_user.id)
+    created = poll_service.create_poll(db_session, poll_data)
+    assert created["options"] == ["C", "A", "B"]
+    assert poll_service.get_poll(db_session, created["id"])["options"] == ["C", "A", "B"]
+
+def test_vote_on_poll_twice_is_rejected(db_session, test_poll, test_user):
+    first = poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", test_user.id)
+    second = poll_service.vote_on_poll(db_session, test_poll.id, "Option 2", test_user.id)
+    assert first["message"] == "Vote recorded successfully"
+    assert second == {"error": "User already voted on this poll"}
+
+    results = poll_service.get_poll_results(db_session, test_poll.id)
+    assert results["results"] == {"Option 1": 1, "Option 2": 0}
+
+def test_votes_unique_per_user_and_poll(db_session, test_poll, test_user):
+    from sqlalchemy.exc import IntegrityError
+    from app.models.vote import Vote
+    option_id = test_poll.options[0].id
+    db_session.add(Vote(poll_id=test_poll.id, option_id=option_id, user_id=test_user.id))
+    db_session.commit()
+    db_session.add(Vote(poll_id=test_poll.id, option_id=option_id, user_id=test_user.id))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+
+@pytest.fixture
+def published_events():
+    from app.utils import events
+    received = []
+
+    def listener(topic, event):
+        received.append((topic, event))
+
+    events.add_listener(listener)
+    yield received
+    events.remove_listener(listener)
+
+def test_write_paths_publish_poll_events(db_session, test_poll, test_user, published_events):
+    topic = f"poll:{test_poll.id}"
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 2", test_user.id)
+    poll_service.like_poll(db_session, test_poll.id, test_user.id)
+    poll_service.add_comment(db_session, test_poll.id, CommentCreate(content="Live!", user_id=test_user.id))
+
+    assert [t for t, _ in published_events] == [topic, topic, topic]
+    vote, like, comment = [event for _, event in published_events]
+    assert vote == {"type": "vote", "poll_id": test_poll.id, "option_id": test_poll.options[1].id, "option": "Option 2", "delta": 1, "count": 1}
+    assert like == {"type": "like", "poll_id": test_poll.id, "delta": 1, "likes": 1, "version": 1}
+    assert comment["type"] == "comment"
+    assert comment["comment"]["content"] == "Live!"
+
+def test_rejected_vote_publishes_nothing(db_session, test_poll, test_user, published_events):
+    poll_service.vote_on_poll(db_session, test_poll.id, "Nope", test_user.id)
+    assert published_events == []
+
+def test_like_toggle_returns_new_count(db_session, test_poll, test_user):
+    from app.models.user import User
+    other = User(username="second_liker", password="x")
+    db_session.add(other)
+    db_session.commit()
+
+    assert poll_service.like_poll(db_session, test_poll.id, test_user.id) == {"message": "Poll liked", "poll_id": test_poll.id, "liked": True, "likes": 1}
+    assert poll_service.like_poll(db_session, test_poll.id, other.id)["likes"] == 2
+    assert poll_service.like_poll(db_session, test_poll.id, test_user.id) == {"message": "Poll unliked", "poll_id": test_poll.id, "liked": False, "likes": 1}
+    assert poll_service.check_user_liked(db_session, test_poll.id, test_user.id) == {"has_liked": False}
+
+def test_like_missing_poll(db_session, test_user, published_events):
+    assert poll_service.like_poll(db_session, 999999, test_user.id) == {"error": "Poll not found"}
+    assert published_events == []
+
+def test_get_user_poll_statuses(db_session, test_user):
+    polls = _make_polls(db_session, test_user, [0, 0, 0])
+    poll_service.vote_on_poll(db_session, polls[0].id, "A", test_user.id)
+    poll_service.like_poll(db_session, polls[1].id, test_user.id)
+
+    ids = [polls[1].id, polls[0].id, polls[2].id, polls[0].id]
+    assert poll_service.get_user_poll_statuses(db_session, ids, test_user.id) == [
+        {"poll_id": polls[1].id, "has_voted": False, "selected_option": None, "has_liked": True},
+        {"poll_id": polls[0].id, "has_voted": True, "selected_option": "A", "has_liked": False},
+        {"poll_id": polls[2].id, "has_voted": False, "selected_option": None, "has_liked": False},
+    ]
+
+def test_export_poll_votes_in_batches(db_session, test_poll, test_user):
+    from app.models.user import User
+    voters = [User(username=f"exporter_{i}", password="x") for i in range(2)]
+    db_session.add_all(voters)
+    db_session.commit()
+    for user in [test_user] + voters:
+        poll_service.vote_on_poll(db_session, test_poll.id, "Option 2", user.id)
+
+    batches = list(poll_service.export_poll_votes(db_session, test_poll.id, test_user.id, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert [row[4] for batch in batches for row in batch] == [test_user.id] + [u.id for u in voters]
+    assert batches[0][0][1:4] == (test_poll.id, test_poll.options[1].id, "Option 2")
+    assert poll_service.export_poll_votes(db_session, test_poll.id, voters[0].id) == {"error": "Only the poll's creator can export its votes"}
+    assert poll_service.export_poll_votes(db_session, 999999, test_user.id) is None
+
+def test_export_tallies(db_session, test_poll, test_user):
+    poll_service.vote_on_poll(db_session, test_poll.id, "Option 1", test_user.id)
+    rows = [row for batch in poll_service.export_tallies(db_session) for row in batch if row[0] == test_poll.id]
+    assert [(row[3], row[4]) for row in rows] == [("Option 1", 1), ("Option 2", 0)]
+
+def test_search_polls_ranks_and_pages(db_session, test_user):
+    for question, options in (
+        ("Best pizza topping?", ["Pineapple", "Mushroom"]),
+        ("Pizza or pasta tonight?", ["Pizza", "Pasta"]),
+        ("Favourite editor?", ["Vim", "Emacs"]),
+    ):
+        poll_service.create_poll(db_session, PollCreate(question=question, options=options, creator_id=test_user.id))
+
+    first = poll_service.search_polls(db_session, "pizza", limit=1)
+    # Matching the question and an option outranks matching the question alone
+    assert [p["question"] for p in first["items"]] == ["Pizza or pasta tonight?"]
+    second = poll_service.search_polls(db_session, "pizza", limit=1, cursor=first["next_cursor"])
+    assert [p["question"] for p in second["items"]] == ["Best pizza topping?"]
+    assert second["next_cursor"] is None
+
+    # Options are indexed, the last word matches as a prefix, and stems match
+    assert [p["question"] for p in poll_service.search_polls(db_session, "ema")["items"]] == ["Favourite editor?"]
+    assert [p["question"] for p in poll_service.search_polls(db_session, "toppings")["items"]] == ["Best pizza topping?"]
+    assert poll_service.search_polls(db_session, "sushi")["items"] == []
+
+def test_search_polls_rejects_bad_input(db_session):
+    with pytest.raises(ValueError):
+        poll_service.search_polls(db_session, '"*()')
+    with pytest.raises(ValueError):
+        poll_service.search_polls(db_session, "pizza", cursor="garbage")
+
+def test_rebuild_search_index(db_session, test_poll):
+    # test_poll is inserted directly, so only a rebuild indexes it
+    assert test_poll.id not in [p["id"] for p in poll_service.search_polls(db_session, "test poll")["items"]]
+    poll_service.rebuild_search_index(db_session)
+    assert test_poll.id in [p["id"] for p in poll_service.search_polls(db_session, "test poll")["items"]]
@@ -0,0 +1,167 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.user import User
+from app.models.polls import Poll
+from app.models.poll_option import PollOption
+from app.models.vote import Vote
+from app.services import poll_service
+from app.services.vote_queue import VoteQueue
+from app.utils import events
+
+@pytest.fixture
+def session_factory():
+    # The writer thread opens its own sessions, so it gets a private database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def seeded(session_factory):
+    db = session_factory()
+    users = [User(username=f"queued_{i}", password="x") for i in range(5)]
+    poll = Poll(question="Queued?", creator_id=None, options=[PollOption(position=0, label="A"), PollOption(position=1, label="B")])
+    db.add_all(users + [poll])
+    db.commit()
+    ids = {"users": [u.id for u in users], "poll": poll.id, "a": poll.options[0].id, "b": poll.options[1].id}
+    db.close()
+    return ids
+
+@pytest.fixture
+def queue(session_factory):
+    # A long interval keeps the writer idle so tests decide when batches are written
+    vote_queue = VoteQueue(session_factory, max_batch=10, flush_interval=60)
+    yield vote_queue
+    vote_queue.stop()
+
+def test_flush_writes_votes_and_tallies(session_factory, seeded, queue):
+    received = []
+
+    def listener(topic, event):
+        received.append(event)
+
+    events.add_listener(listener)
+    try:
+        for user_id in seeded["users"][:3]:
+            assert queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+        assert queue.pending_vote(seeded["poll"], seeded["users"][0])["option"] == "A"
+        queue.flush()
+    finally:
+        events.remove_listener(listener)
+
+    assert queue.pending_vote(seeded["poll"], seeded["users"][0]) is None
+    assert queue.stats["written"] == 3
+    assert queue.stats["batches"] == 1
+    db = session_factory()
+    assert db.query(Vote).count() == 3
+    assert poll_service.get_poll_results(db, seeded["poll"])["results"] == {"A": 3, "B": 0}
+    # One batch, one version bump
+    assert poll_service.get_poll_versions(db, seeded["poll"])["results"] == 1
+    db.close()
+    assert [(e["delta"], e["count"]) for e in received] == [(3, 3)]
+
+def test_batches_are_capped_at_max_batch(session_factory, seeded):
+    vote_queue = VoteQueue(session_factory, max_batch=2, flush_interval=60)
+    for user_id in seeded["users"]:
+        vote_queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+    vote_queue.stop()
+    assert vote_queue.stats["written"] == 5
+    assert vote_queue.stats["batches"] >= 3
+
+def test_duplicate_submissions_are_refused(seeded, queue):
+    user_id = seeded["users"][0]
+    assert queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+    assert not queue.submit(seeded["poll"], seeded["b"], "B", user_id)
+
+def test_already_stored_votes_are_skipped(session_factory, seeded, queue):
+    user_id = seeded["users"][0]
+    queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+    queue.flush()
+    queue.submit(seeded["poll"], seeded["b"], "B", user_id)
+    queue.flush()
+    assert queue.stats["duplicates"] == 1
+    db = session_factory()
+    assert poll_service.get_poll_results(db, seeded["poll"])["results"] == {"A": 1, "B": 0}
+    db.close()
+
+def test_full_queue_raises(session_factory, seeded):
+    small = VoteQueue(session_factory, max_batch=10, flush_interval=60, max_pending=1)
+    small.submit(seeded["poll"], seeded["a"], "A", seeded["users"][0])
+    with pytest.raises(VoteQueue.QueueFullError):
+        small.submit(seeded["poll"], seeded["a"], "A", seeded["users"][1])
+    small.stop()
+
+def test_stop_drains_pending_votes(session_factory, seeded):
+    vote_queue = VoteQueue(session_factory, max_batch=100, flush_interval=60)
+    for user_id in seeded["users"]:
+        vote_queue.submit(seeded["poll"], seeded["b"], "B", user_id)
+    vote_queue.stop()
+
+    db = session_factory()
+    assert db.query(Vote).count() == 5
+    db.close()
+    with pytest.raises(VoteQueue.QueueFullError):
+        vote_queue.submit(seeded["poll"], seeded["b"], "B", seeded["users"][0])
+
+def test_enqueue_vote_validates_and_reads_back(session_factory, seeded, queue):
+    db = session_factory()
+    user_id = seeded["users"][0]
+    assert poll_service.enqueue_vote(db, queue, seeded["poll"], "C", user_id) == {"error": "Invalid option"}
+    assert poll_service.enqueue_vote(db, queue, 999999, "A", user_id) == {"error": "Poll not found"}
+
+    accepted = poll_service.enqueue_vote(db, queue, seeded["poll"], "B", user_id)
+    assert accepted["queued"] is True
+    assert poll_service.enqueue_vote(db, queue, seeded["poll"], "A", user_id) == {"error": "User already voted on this poll"}
+    assert poll_service.check_user_voted(db, seeded["poll"], user_id, queue) == {"has_voted": True, "selected_option": "B"}
+
+    queue.flush()
+    assert poll_service.check_user_voted(db, seeded["poll"], user_id, queue) == {"has_voted": True, "selected_option": "B"}
+    db.close()
+
+class FlakyVoteQueue(VoteQueue):
+    """Fails every batch that contains a vote from one of the poisoned users."""
+
+    def __init__(self, *args, poisoned=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.poisoned = set(poisoned)
+
+    def _write(self, votes):
+        if any(vote["user_id"] in self.poisoned for vote in votes):
+            raise RuntimeError("write failed")
+        return super()._write(votes)
+
+def test_failing_vote_is_isolated_and_dropped(session_factory, seeded):
+    poison = seeded["users"][2]
+    vote_queue = FlakyVoteQueue(session_factory, max_batch=10, flush_interval=60, max_attempts=3, poisoned={poison})
+    for user_id in seeded["users"]:
+        vote_queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+    for _ in range(10):
+        if vote_queue.flush():
+            break
+
+    assert vote_queue.stats["written"] == 4
+    assert vote_queue.stats["dropped"] == 1
+    assert vote_queue.pending_vote(seeded["poll"], poison) is None
+    db = session_factory()
+    assert {vote.user_id for vote in db.query(Vote)} == set(seeded["users"]) - {poison}
+    db.close()
+    assert vote_queue.stop() == []
+
+def test_stop_reports_votes_it_could_not_write(session_factory, seeded, caplog):
+    vote_queue = FlakyVoteQueue(session_factory, max_batch=10, flush_interval=60, max_attempts=100, max_backoff=0.01,
+                                shutdown_timeout=0.05, poisoned=set(seeded["users"]))
+    for user_id in seeded["users"][:2]:
+        vote_queue.submit(seeded["poll"], seeded["a"], "A", user_id)
+
+    unwritten = vote_queue.stop()
+    assert sorted(vote["user_id"] for vote in unwritten) == seeded["users"][:2]
+    assert vote_queue.stats["dropped"] == 2
+    assert "2 accepted votes unwritten" in caplog.text
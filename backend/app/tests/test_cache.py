@@ -0,0 +1,59 @@
+import pytest
+
+from ..utils.cache import RedisCache, TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("poll:1", {"id": 1}, cache.token("poll:1"))
+    clock.now = 9.9
+    assert cache.get("poll:1") == {"id": 1}
+    clock.now = 10
+    assert cache.get("poll:1") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.set(key, key, cache.token(key))
+    cache.get("a")
+    cache.set("c", "c", cache.token("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+    assert cache.stats["evictions"] == 1
+
+def test_load_started_before_invalidation_is_not_stored():
+    cache = TTLCache()
+    token = cache.token("poll:1")
+    cache.invalidate("poll:1")
+    assert not cache.set("poll:1", "stale", token)
+    assert cache.get("poll:1") is None
+    # Other keys are unaffected, and a fresh load is stored
+    assert cache.set("poll:2", "ok", token)
+    assert cache.set("poll:1", "fresh", cache.token("poll:1"))
+
+def test_forgotten_invalidations_still_refuse_old_tokens():
+    cache = TTLCache(maxsize=1)
+    token = cache.token("a")
+    cache.invalidate("a")
+    cache.invalidate("b")  # pushes "a" out of the invalidation log
+    assert not cache.set("a", "stale", token)
+
+def test_redis_cache_refuses_stale_loads():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache(fakeredis.FakeRedis(), ttl=30)
+    token = cache.token("poll:1")
+    assert cache.set("poll:1", {"id": 1}, token)
+    assert cache.get("poll:1") == {"id": 1}
+
+    cache.invalidate("poll:1")
+    assert cache.get("poll:1") is None
+    assert not cache.set("poll:1", {"id": 1}, token)
+    assert cache.stats == {"hits": 1, "misses": 1, "sets": 1, "invalidations": 1, "evictions": 0}
@@ -0,0 +1,54 @@
+from ..utils.coalescer import EventCoalescer
+
+def _vote(option, count):
+    return {"type": "vote", "poll_id": 1, "option_id": 0, "option": option, "delta": 1, "count": count}
+
+def test_votes_and_likes_fold_into_one_tally_per_topic():
+    emitted = []
+    coalescer = EventCoalescer(lambda topic, event: emitted.append((topic, event)), window=60)
+    coalescer.submit("poll:1", _vote("Yes", 1))
+    coalescer.submit("poll:1", _vote("Yes", 2))
+    coalescer.submit("poll:1", _vote("No", 1))
+    coalescer.submit("poll:1", {"type": "like", "poll_id": 1, "delta": 1, "likes": 4})
+    coalescer.submit("poll:2", {"type": "like", "poll_id": 2, "delta": -1, "likes": 0})
+    assert emitted == []
+
+    coalescer.stop()
+    assert sorted(emitted, key=lambda item: item[0]) == [
+        ("poll:1", {"type": "tally", "poll_id": 1, "merged": 4, "results": {"Yes": 2, "No": 1}, "likes": 4}),
+        ("poll:2", {"type": "tally", "poll_id": 2, "merged": 1, "likes": 0}),
+    ]
+    assert coalescer.stats == {"received": 5, "emitted": 2, "merged": 3}
+
+def test_comments_pass_through():
+    emitted = []
+    coalescer = EventCoalescer(lambda topic, event: emitted.append((topic, event)), window=60)
+    comment = {"type": "comment", "poll_id": 1, "comment": {"content": "hi"}}
+    coalescer.submit("poll:1", comment)
+    assert emitted == [("poll:1", comment)]
+    coalescer.stop()
+
+def test_zero_window_disables_coalescing():
+    emitted = []
+    coalescer = EventCoalescer(lambda topic, event: emitted.append((topic, event)), window=0)
+    coalescer.submit("poll:1", _vote("Yes", 1))
+    assert emitted == [("poll:1", _vote("Yes", 1))]
+
+def test_flusher_thread_emits_each_window():
+    import threading
+    done = threading.Event()
+    coalescer = EventCoalescer(lambda topic, event: done.set(), window=0.01)
+    coalescer.submit("poll:1", _vote("Yes", 1))
+    assert done.wait(1)
+    coalescer.stop()
+
+def test_out_of_order_events_keep_the_newest_counts():
+    emitted = []
+    coalescer = EventCoalescer(lambda topic, event: emitted.append(event), window=60)
+    # Published after commit from different threads, so the later commit can arrive first
+    coalescer.submit("poll:1", _vote("Yes", 3))
+    coalescer.submit("poll:1", _vote("Yes", 2))
+    coalescer.submit("poll:1", {"type": "like", "poll_id": 1, "delta": -1, "likes": 4, "version": 9})
+    coalescer.submit("poll:1", {"type": "like", "poll_id": 1, "delta": 1, "likes": 5, "version": 8})
+    coalescer.stop()
+    assert emitted == [{"type": "tally", "poll_id": 1, "merged": 4, "results": {"Yes": 3}, "likes": 4}]
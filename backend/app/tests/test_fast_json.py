@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from ..core.config import settings
+from ..schemas import poll_schema
+from ..utils import fast_json
+
+COMMENTS = [{"id": 1, "content": "Hi ✓", "user_id": 2, "username": "ann", "created_at": datetime(2025, 1, 1, 12, 0, 0, 123456)}]
+
+def test_dumps_matches_validated_output():
+    validated = TypeAdapter(list[poll_schema.Comment]).dump_json(COMMENTS)
+    assert json.loads(fast_json.dumps(COMMENTS)) == json.loads(validated)
+
+def test_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert json.loads(fast_json.dumps(COMMENTS))[0]["created_at"] == "2025-01-01T12:00:00.123456"
+
+def test_list_response_is_opt_in(monkeypatch):
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    assert fast_json.list_response(COMMENTS, response) is COMMENTS
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = fast_json.list_response(COMMENTS, response)
+    assert fast.headers["x-next-cursor"] == "abc"
+    assert fast.media_type == "application/json"
+    assert json.loads(fast.body)[0]["username"] == "ann"
@@ -0,0 +1,32 @@
+from starlette.requests import Request
+from fastapi import Response
+
+from ..utils.http_cache import conditional_response, poll_etag
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def test_missing_poll_has_no_etag():
+    assert poll_etag("poll", 1, None) is None
+    response = Response()
+    assert conditional_response(_request('"poll-1-0"'), response, None) is None
+    assert "etag" not in response.headers
+
+def test_fresh_request_is_tagged():
+    etag = poll_etag("results", 1, 4)
+    response = Response()
+    assert conditional_response(_request(), response, etag) is None
+    assert response.headers["etag"] == etag
+    assert "must-revalidate" in response.headers["cache-control"]
+
+def test_matching_tag_is_not_modified():
+    etag = poll_etag("results", 1, 4)
+    for header in (etag, f'W/{etag}', f'"other", {etag}', "*"):
+        not_modified = conditional_response(_request(header), Response(), etag)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+def test_stale_tag_gets_the_body():
+    stale = poll_etag("results", 1, 3)
+    assert conditional_response(_request(stale), Response(), poll_etag("results", 1, 4)) is None
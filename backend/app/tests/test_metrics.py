@@ -0,0 +1,64 @@
+import logging
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from ..utils.instrumentation import RequestMetricsMiddleware, install_query_hooks
+from ..utils.metrics import Registry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("req_seconds", "Latency", buckets=(0.1, 1))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    registry.counter("hits_total", "Hits").inc(route='/say "hi"')
+
+    rendered = registry.render()
+    assert 'req_seconds_bucket{route="/a",le="0.1"} 1' in rendered
+    assert 'req_seconds_bucket{route="/a",le="1"} 2' in rendered
+    assert 'req_seconds_bucket{route="/a",le="+Inf"} 3' in rendered
+    assert 'req_seconds_count{route="/a"} 3' in rendered
+    assert 'hits_total{route="/say \\"hi\\""} 1' in rendered
+    assert "# TYPE req_seconds histogram" in rendered
+
+def _instrumented_app(registry, threshold, db_session):
+    install_query_hooks()
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, registry=registry, query_warn_threshold=threshold)
+
+    def get_session():
+        return db_session
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, db=Depends(get_session)):
+        for _ in range(3):
+            db.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    return app
+
+def test_requests_are_timed_and_queries_counted(db_session, caplog):
+    registry = Registry()
+    client = TestClient(_instrumented_app(registry, threshold=2, db_session=db_session))
+    with caplog.at_level(logging.WARNING):
+        assert client.get("/items/1").status_code == 200
+        client.get("/items/2")
+        client.get("/missing")
+
+    rendered = registry.render()
+    assert 'pollify_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in rendered
+    assert 'pollify_http_requests_total{method="GET",route="unmatched",status="404"} 1' in rendered
+    assert 'pollify_http_request_queries_sum{method="GET",route="/items/{item_id}"} 6' in rendered
+    assert 'pollify_http_request_query_threshold_exceeded_total{method="GET",route="/items/{item_id}"} 2' in rendered
+    assert "possible N+1 query" in caplog.text
+
+def test_metrics_endpoint(client):
+    client.get("/api/v1/polls/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'pollify_http_request_duration_seconds_count{method="GET",route="/api/v1/polls/"}' in response.text
+    assert "pollify_websocket_connections" in response.text
+    assert 'pollify_cache_events_total{cache="principal",event="hits"}' in response.text
+    assert 'pollify_event_coalescer_events_total{event="merged"}' in response.text
@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+
+from ..db.base import Base
+from ..db.migrations import (
+    ALEMBIC_INI,
+    LEGACY_REVISION,
+    SchemaError,
+    alembic_config,
+    check_schema,
+    head_revision,
+    prepare_schema,
+    upgrade_schema,
+)
+from ..db.search import include_name
+from ..db.session import create_db_engine
+
+@pytest.fixture
+def engine(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield db_engine
+    db_engine.dispose()
+
+def test_migrations_build_the_model_schema(engine):
+    upgrade_schema(engine)
+    check_schema(engine)
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_name": include_name})
+        assert compare_metadata(context, Base.metadata) == []
+
+def test_migrate_mode_is_idempotent(engine):
+    prepare_schema(engine, "migrate")
+    prepare_schema(engine, "migrate")
+    prepare_schema(engine, "check")
+
+def test_check_refuses_an_outdated_database(engine):
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0a6d4f3e8c27")
+    with pytest.raises(SchemaError, match=head_revision()):
+        prepare_schema(engine, "check")
+
+def _create_legacy_schema(engine):
+    # What create_all() built before migrations drove the schema: options as a
+    # JSON string on polls, votes naming the option label, no tallies
+    metadata = sa.MetaData()
+    sa.Table("users", metadata, sa.Column("id", sa.Integer, primary_key=True),
+             sa.Column("username", sa.String, unique=True, index=True), sa.Column("password", sa.String))
+    sa.Table("polls", metadata, sa.Column("id", sa.Integer, primary_key=True), sa.Column("question", sa.String, nullable=False),
+             sa.Column("options", sa.String, nullable=False), sa.Column("creator_id", sa.Integer, sa.ForeignKey("users.id")),
+             sa.Column("likes", sa.Integer))
+    sa.Table("votes", metadata, sa.Column("id", sa.Integer, primary_key=True), sa.Column("poll_id", sa.Integer, sa.ForeignKey("polls.id")),
+             sa.Column("option", sa.String, nullable=False), sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")))
+    sa.Table("comments", metadata, sa.Column("id", sa.Integer, primary_key=True), sa.Column("poll_id", sa.Integer, sa.ForeignKey("polls.id")),
+             sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")), sa.Column("content", sa.String), sa.Column("created_at", sa.DateTime))
+    sa.Table("likes", metadata, sa.Column("id", sa.Integer, primary_key=True), sa.Column("poll_id", sa.Integer, sa.ForeignKey("polls.id")),
+             sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")), sa.UniqueConstraint("poll_id", "user_id", name="unique_poll_user_like"))
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO users (id, username, password) VALUES (1, 'legacy', 'x')"))
+        connection.execute(
+            sa.text("INSERT INTO polls (id, question, options, creator_id, likes) VALUES (1, 'Legacy?', :options, 1, 0)"),
+            {"options": json.dumps(["Yes", "No"])},
+        )
+        connection.execute(sa.text("INSERT INTO votes (poll_id, option, user_id) VALUES (1, 'No', 1)"))
+
+def _assert_legacy_data_converted(engine):
+    check_schema(engine)
+    with engine.connect() as connection:
+        assert connection.execute(sa.text("SELECT label FROM poll_options WHERE poll_id = 1 ORDER BY position")).scalars().all() == ["Yes", "No"]
+        assert connection.execute(sa.text(
+            "SELECT poll_options.label, vote_count FROM poll_option_counts JOIN poll_options ON poll_options.id = option_id"
+        )).all() == [("No", 1)]
+
+def test_check_explains_how_to_adopt_a_legacy_database(engine):
+    _create_legacy_schema(engine)
+    with pytest.raises(SchemaError, match="`alembic upgrade head` adopts it"):
+        check_schema(engine)
+
+    # The manual route still works
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, LEGACY_REVISION)
+        command.upgrade(config, "head")
+    _assert_legacy_data_converted(engine)
+
+def test_migrate_mode_adopts_a_legacy_database(engine):
+    _create_legacy_schema(engine)
+    prepare_schema(engine, "migrate")
+    _assert_legacy_data_converted(engine)
+
+def test_alembic_upgrade_adopts_a_legacy_database(engine, tmp_path):
+    # What the Docker image runs on start
+    _create_legacy_schema(engine)
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", str(ALEMBIC_INI), "upgrade", "head"],
+        cwd=tmp_path, env={**os.environ, "DATABASE_URL": str(engine.url)}, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    _assert_legacy_data_converted(engine)
+
+def test_downgrade_leaves_a_legacy_database_alone(engine):
+    _create_legacy_schema(engine)
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "base")
+    with engine.connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() is None
+    assert sa.inspect(engine).has_table("polls")
+
+def test_unknown_mode(engine):
+    prepare_schema(engine, "off")
+    with pytest.raises(ValueError):
+        prepare_schema(engine, "sometimes")
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from ..core.security import create_access_token
+from ..utils.admission import AdmissionControlMiddleware, client_key
+from ..utils.metrics import Registry
+from ..utils.rate_limit import RedisTokenBucketLimiter, TokenBucketLimiter
+
+pytestmark = pytest.mark.asyncio
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def test_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [await limiter.acquire("user:1") for _ in range(3)] == [0, 0, 0]
+    assert await limiter.acquire("user:1") == pytest.approx(0.5)
+    # Buckets are per key
+    assert await limiter.acquire("user:2") == 0
+    clock.now = 0.5
+    assert await limiter.acquire("user:1") == 0
+    assert await limiter.acquire("user:1") > 0
+
+async def test_idle_keys_are_evicted():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2, clock=FakeClock())
+    for key in ("a", "b", "c"):
+        await limiter.acquire(key)
+    # "a" was evicted and starts with a full bucket again
+    assert await limiter.acquire("a") == 0
+    assert await limiter.acquire("c") > 0
+
+async def test_redis_buckets_are_shared():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    clock = FakeClock()
+    workers = [RedisTokenBucketLimiter(client, rate=1, burst=2, clock=clock) for _ in range(2)]
+    assert await workers[0].acquire("user:1") == 0
+    assert await workers[1].acquire("user:1") == 0
+    assert await workers[0].acquire("user:1") == pytest.approx(1)
+    clock.now = 1
+    assert await workers[1].acquire("user:1") == 0
+
+async def test_client_key_prefers_the_token_user():
+    token = create_access_token({"sub": "ann", "uid": 7})
+    with_token = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 1234)}
+    assert client_key(with_token) == "user:7"
+    bad_token = {"headers": [(b"authorization", b"Bearer nope")], "client": ("10.0.0.1", 1234)}
+    assert client_key(bad_token) == "ip:10.0.0.1"
+
+def _app(registry, **options):
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.post("/api/v1/polls/{poll_id}/like")
+    def like(poll_id: int):
+        return {"ok": True}
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, registry=registry, **options)
+    return app, release
+
+async def test_writes_over_the_limit_get_429():
+    registry = Registry()
+    app, _ = _app(registry, limiter=TokenBucketLimiter(rate=1, burst=2))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [(await client.post("/api/v1/polls/1/like")).status_code for _ in range(3)]
+        limited = await client.post("/api/v1/polls/1/like")
+        # Reads are never rate limited
+        assert (await client.get("/openapi.json")).status_code == 200
+    assert statuses == [200, 200, 429]
+    assert limited.headers["Retry-After"] == "1"
+    assert "pollify_http_requests_rejected_total{reason=\"rate_limited\"} 2" in registry.render()
+
+async def test_requests_over_the_concurrency_limit_get_503():
+    registry = Registry()
+    app, release = _app(registry, max_concurrent=1)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        pending = asyncio.create_task(client.get("/slow"))
+        while "pollify_http_requests_in_flight 1" not in registry.render():
+            await asyncio.sleep(0)
+        shed = await client.get("/slow")
+        release.set()
+        assert (await pending).status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert "pollify_http_requests_in_flight 0" in registry.render()
@@ -22,3 +22,42 @@ def test_invalid_token_verification():
     invalid_token = "invalid.token.here"
     result = verify_token(invalid_token)
     assert result is None
+
+def test_bcrypt_hashes_are_salted_and_verify():
+    from ..core.hashing import PasswordHasher
+    hasher = PasswordHasher(rounds=4, workers=1)
+    first, second = hasher.hash("s3cret"), hasher.hash("s3cret")
+    assert first != second and first.startswith("$2b$04$")
+    assert hasher.verify("s3cret", first)
+    assert not hasher.verify("wrong", first)
+    assert not hasher.verify("s3cret", "not-a-hash")
+    # Only the first 72 bytes count, and longer passwords must not raise
+    assert hasher.verify("x" * 100, hasher.hash("x" * 72))
+    hasher.shutdown()
+
+def test_needs_rehash():
+    from ..core.hashing import PasswordHasher
+    hasher = PasswordHasher(rounds=5, workers=1)
+    assert hasher.needs_rehash(hashlib.sha256(b"pw").hexdigest())
+    assert hasher.needs_rehash(PasswordHasher(rounds=4, workers=1).hash("pw"))
+    assert not hasher.needs_rehash(hasher.hash("pw"))
+    hasher.shutdown()
+
+def test_saturated_hasher_refuses_work():
+    from ..core.hashing import PasswordHasher
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=0)
+    with pytest.raises(PasswordHasher.HashingBusyError):
+        hasher.hash("pw")
+    hasher.shutdown()
+
+def test_async_hashing():
+    import asyncio
+    from ..core.hashing import PasswordHasher
+    hasher = PasswordHasher(rounds=4, workers=1)
+
+    async def roundtrip():
+        hashed = await hasher.hash_async("pw")
+        return await hasher.verify_async("pw", hashed), await hasher.verify_async("nope", hashed)
+
+    assert asyncio.run(roundtrip()) == (True, False)
+    hasher.shutdown()
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from ..core.config import settings
+from ..db.session import async_database_url, create_db_engine, engine_options
+
+def test_postgres_engine_options_use_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    options = engine_options("postgresql://user:pw@db/pollify")
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert "connect_args" not in options
+
+def test_postgres_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 2500)
+    sync_options = engine_options("postgresql://user:pw@db/pollify")
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=2500"}
+    async_options = engine_options("postgresql+asyncpg://user:pw@db/pollify")
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "2500"}}
+
+def test_sqlite_engine_options_skip_pool_sizing():
+    assert engine_options("sqlite:///./polls.db") == {"connect_args": {"check_same_thread": False}}
+    assert engine_options("sqlite+aiosqlite:///./polls.db") == {}
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./polls.db") == "sqlite+aiosqlite:///./polls.db"
+    assert async_database_url("postgresql://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    assert async_database_url("postgresql+asyncpg://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+
+def test_sqlite_file_engine_enables_wal(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    with db_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+    db_engine.dispose()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import sys
+import pytest
+from ..utils.pubsub import InMemoryBroker, RedisBroker, create_broker
+from ..utils.websocket_manager import ConnectionManager
+
+pytestmark = pytest.mark.asyncio
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+class StuckWebSocket(FakeWebSocket):
+    async def send_text(self, data):
+        await asyncio.Event().wait()
+
+class BrokenWebSocket(FakeWebSocket):
+    async def send_text(self, data):
+        raise RuntimeError("connection reset")
+
+async def _wait_for(predicate, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+async def test_broadcast_reaches_local_sockets():
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket(), FakeWebSocket()]
+    for ws in sockets:
+        await manager.connect(ws)
+
+    await manager.broadcast({"message": "hi"})
+    await _wait_for(lambda: all(ws.sent for ws in sockets))
+    assert [ws.sent for ws in sockets] == [[{"message": "hi"}], [{"message": "hi"}]]
+
+async def test_shared_broker_fans_out_to_every_manager():
+    broker = InMemoryBroker()
+    first, second = ConnectionManager(broker), ConnectionManager(broker)
+    ws_first, ws_second = FakeWebSocket(), FakeWebSocket()
+    await first.connect(ws_first)
+    await second.connect(ws_second)
+
+    await first.broadcast({"message": "hello"})
+    await _wait_for(lambda: ws_first.sent and ws_second.sent)
+    assert ws_first.sent == [{"message": "hello"}]
+    assert ws_second.sent == [{"message": "hello"}]
+
+async def test_redis_broker_fans_out_across_processes():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = ConnectionManager(RedisBroker(fakeredis.FakeAsyncRedis(server=server)))
+    second = ConnectionManager(RedisBroker(fakeredis.FakeAsyncRedis(server=server)))
+    ws_first, ws_second = FakeWebSocket(), FakeWebSocket()
+    await first.connect(ws_first)
+    await second.connect(ws_second)
+
+    await first.broadcast({"message": "replicated"})
+    await _wait_for(lambda: ws_first.sent and ws_second.sent)
+    assert ws_first.sent == [{"message": "replicated"}]
+    assert ws_second.sent == [{"message": "replicated"}]
+
+    await first.stop()
+    await second.stop()
+
+async def test_create_broker_defaults_to_memory():
+    assert isinstance(create_broker(""), InMemoryBroker)
+    assert isinstance(create_broker("redis://localhost:6379/0"), RedisBroker)
+
+async def test_redis_broker_without_package_names_the_setting(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis.asyncio", None)
+    with pytest.raises(RuntimeError, match="BROKER_URL"):
+        create_broker("redis://localhost:6379/0")
+
+async def test_topic_messages_only_reach_subscribers():
+    manager = ConnectionManager()
+    watcher, bystander = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(watcher)
+    await manager.connect(bystander)
+    manager.subscribe(watcher, "poll:1")
+
+    await manager.publish("poll:1", {"type": "vote", "poll_id": 1})
+    await manager.publish("poll:2", {"type": "vote", "poll_id": 2})
+    await _wait_for(lambda: watcher.sent)
+    assert watcher.sent == [{"type": "vote", "poll_id": 1}]
+    assert bystander.sent == []
+
+    manager.disconnect(watcher)
+    assert "poll:1" not in manager.subscriptions
+
+async def test_disconnect_only_leaves_own_topics():
+    manager = ConnectionManager()
+    leaving, staying = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(leaving)
+    await manager.connect(staying)
+    manager.subscribe(leaving, "poll:1")
+    manager.subscribe(staying, "poll:1")
+    manager.subscribe(staying, "poll:2")
+
+    manager.disconnect(leaving)
+    assert manager.subscriptions == {"poll:1": {staying}, "poll:2": {staying}}
+
+async def test_subscribe_rejects_unknown_topics():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    with pytest.raises(ValueError):
+        manager.subscribe(ws, "users:1")
+
+async def test_publish_nowait_from_worker_thread():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    manager.subscribe(ws, "poll:7")
+
+    await asyncio.to_thread(manager.publish_nowait, "poll:7", {"type": "like", "likes": 1})
+    await _wait_for(lambda: ws.sent)
+    assert ws.sent == [{"type": "like", "likes": 1}]
+
+async def test_slow_consumer_does_not_stall_others_and_is_disconnected():
+    manager = ConnectionManager(queue_size=2)
+    stuck, healthy = StuckWebSocket(), FakeWebSocket()
+    await manager.connect(stuck)
+    await manager.connect(healthy)
+
+    for i in range(5):
+        await manager.broadcast({"n": i})
+        await asyncio.sleep(0)  # a healthy client keeps up between messages
+    await _wait_for(lambda: len(healthy.sent) == 5)
+
+    assert stuck not in manager.active_connections
+    assert manager.stats["slow_disconnects"] == 1
+    await _wait_for(lambda: stuck.closed_with == 1013)
+
+async def test_drop_policy_keeps_newest_messages():
+    manager = ConnectionManager(queue_size=2, slow_consumer_policy="drop")
+    stuck = StuckWebSocket()
+    await manager.connect(stuck)
+
+    for i in range(5):
+        await manager.broadcast({"n": i})
+    assert stuck in manager.active_connections
+    assert manager.stats["dropped"] >= 2
+    queued = [json.loads(item) for item in manager.active_connections[stuck].queue._queue]
+    assert queued[-1] == {"n": 4}
+
+async def test_failed_send_removes_socket():
+    manager = ConnectionManager()
+    broken, healthy = BrokenWebSocket(), FakeWebSocket()
+    await manager.connect(broken)
+    await manager.connect(healthy)
+    manager.subscribe(broken, "poll:1")
+
+    await manager.broadcast({"message": "x"})
+    await _wait_for(lambda: broken not in manager.active_connections and healthy.sent)
+    assert manager.subscriptions == {}
+    assert manager.stats["send_failures"] == 1
+
+async def test_unknown_slow_consumer_policy():
+    with pytest.raises(ValueError):
+        ConnectionManager(slow_consumer_policy="block")
@@ -0,0 +1,81 @@
+"""Admission control in front of the app: shed load before it reaches a worker thread.
+
+AdmissionControlMiddleware rejects a request before any routing, dependency or
+database work happens:
+
+- 429 with Retry-After when the caller has used up its token bucket on a rate
+  limited write (vote, like, comment). Callers are keyed by the user id in
+  their bearer token, or by client IP when there is no valid token.
+- 503 with Retry-After when max_concurrent requests are already in flight in
+  this worker, instead of queueing behind the threadpool.
+"""
+import math
+import re
+from typing import Optional, Pattern
+
+from starlette.responses import JSONResponse
+
+from ..core.security import decode_token
+from .metrics import Registry
+
+WRITE_PATHS = re.compile(r"^/api/v1/polls/\d+/(vote|like|comments)$")
+
+def client_key(scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            claims = decode_token(token) if scheme.lower() == "bearer" else None
+            if claims:
+                return f"user:{claims['uid']}" if claims.get("uid") is not None else f"user:{claims['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app,
+        registry: Registry,
+        limiter=None,
+        max_concurrent: int = 0,
+        limited_paths: Pattern = WRITE_PATHS,
+        exempt_paths: tuple = ("/metrics",),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.limited_paths = limited_paths
+        self.exempt_paths = exempt_paths
+        # Only touched from the event loop, so no lock is needed
+        self.in_flight = 0
+        self.rejected = registry.counter("pollify_http_requests_rejected_total", "Requests shed by admission control, by reason")
+        registry.callback("pollify_http_requests_in_flight", "HTTP requests being handled by this worker", lambda: self.in_flight)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self._rate_limit(scope)
+        if retry_after:
+            await self._reject(scope, receive, send, 429, "rate_limited", "Too many requests", retry_after)
+            return
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            await self._reject(scope, receive, send, 503, "overloaded", "Server is busy", 1)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _rate_limit(self, scope) -> Optional[float]:
+        if self.limiter is None or scope["method"] != "POST" or not self.limited_paths.match(scope["path"]):
+            return None
+        return await self.limiter.acquire(client_key(scope))
+
+    async def _reject(self, scope, receive, send, status: int, reason: str, detail: str, retry_after: float):
+        self.rejected.inc(reason=reason)
+        response = JSONResponse({"detail": detail}, status_code=status, headers={"Retry-After": str(math.ceil(retry_after))})
+        await response(scope, receive, send)
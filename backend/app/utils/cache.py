@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from .redis_support import import_redis
+
+class TTLCache:
+    """Process-local LRU cache whose entries also expire ttl seconds after they were stored.
+
+    Readers take a token() before loading from the database and pass it to set();
+    a value loaded before an invalidate() of the same key is then discarded
+    instead of overwriting the fresh state with a stale read.
+    """
+
+    # Calls only take a lock, so async code may make them on the event loop
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "evictions": 0}
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._generation = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def token(self, key: str) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key: str, value: Any, token: int) -> bool:
+        with self._lock:
+            if token < self._floor or self._invalidated.get(key, 0) > token:
+                return False
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self.stats["sets"] += 1
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            return True
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > self.maxsize:
+                # Forgetting a key is safe as long as every older token is refused
+                _, self._floor = self._invalidated.popitem(last=False)
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidated.clear()
+            self._generation += 1
+            self._floor = self._generation
+
+class RedisCache:
+    """Redis-backed cache shared by every worker and replica; values are stored as JSON."""
+
+    # Every call is a network round trip; async callers run them in a thread
+    blocking = True
+
+    def __init__(self, client, ttl: float = 30.0, prefix: str = "pollify:cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "evictions": 0}
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        redis = import_redis("CACHE_URL")
+        return cls(redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(raw)
+
+    def token(self, key: str) -> int:
+        return int(self.client.get(self._generation_key(key)) or 0)
+
+    def set(self, key: str, value: Any, token: int) -> bool:
+        import redis
+
+        generation_key = self._generation_key(key)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(generation_key)
+                if int(pipe.get(generation_key) or 0) != token:
+                    return False
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), px=int(self.ttl * 1000))
+                pipe.execute()
+            except redis.WatchError:
+                return False
+        self.stats["sets"] += 1
+        return True
+
+    def invalidate(self, key: str):
+        generation_key = self._generation_key(key)
+        with self.client.pipeline() as pipe:
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, 86400)
+            pipe.delete(self.prefix + key)
+            pipe.execute()
+        self.stats["invalidations"] += 1
+
+    def clear(self):
+        # Generation keys stay so that loads already in flight are still refused
+        generations = self.prefix + "gen:"
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            if not key.decode().startswith(generations):
+                self.client.delete(key)
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}gen:{key}"
+
+def create_cache(url: str = "", maxsize: int = 1024, ttl: float = 30.0):
+    """Return a Redis cache for redis:// URLs, otherwise the in-process LRU."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache.from_url(url, ttl=ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,88 @@
+import threading
+from typing import Callable, Dict, Optional
+
+Emit = Callable[[str, dict], None]
+
+COALESCED_TYPES = ("vote", "like")
+
+class _Tally:
+    def __init__(self, poll_id: int):
+        self.poll_id = poll_id
+        self.results: Dict[str, int] = {}
+        self.likes: Optional[int] = None
+        self.likes_version = -1
+        self.merged = 0
+
+    def add(self, event: dict):
+        self.merged += 1
+        # Events are published after commit from several threads, so they can
+        # arrive out of commit order; an older event must not replace a newer one
+        if event["type"] == "vote":
+            # Vote counts only grow, so the highest one seen is the newest
+            self.results[event["option"]] = max(self.results.get(event["option"], 0), event["count"])
+        elif event.get("version", 0) >= self.likes_version:
+            # Likes go both ways; the poll version written with the count orders them
+            self.likes = event["likes"]
+            self.likes_version = event.get("version", 0)
+
+    def snapshot(self) -> dict:
+        message = {"type": "tally", "poll_id": self.poll_id, "merged": self.merged}
+        if self.results:
+            message["results"] = self.results
+        if self.likes is not None:
+            message["likes"] = self.likes
+        return message
+
+class EventCoalescer:
+    """Fold vote/like events per topic over a time window into one tally message.
+
+    submit() is safe to call from any thread; a single background thread emits
+    the pending snapshots once per window, so fan-out cost per hot poll is one
+    message per window no matter how many votes arrive. Other event types and
+    a window of 0 pass straight through.
+    """
+
+    def __init__(self, emit: Emit, window: float):
+        self.emit = emit
+        self.window = window
+        self.stats = {"received": 0, "emitted": 0, "merged": 0}
+        self._pending: Dict[str, _Tally] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def submit(self, topic: str, event: dict):
+        if self.window <= 0 or event.get("type") not in COALESCED_TYPES:
+            self.emit(topic, event)
+            return
+        with self._lock:
+            self.stats["received"] += 1
+            tally = self._pending.get(topic)
+            if tally is None:
+                tally = self._pending[topic] = _Tally(event["poll_id"])
+            tally.add(event)
+            if self._flusher is None:
+                self._stopped.clear()
+                self._flusher = threading.Thread(target=self._run, name="event-coalescer", daemon=True)
+                self._flusher.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.stats["emitted"] += len(pending)
+            self.stats["merged"] += sum(tally.merged - 1 for tally in pending.values())
+        for topic, tally in pending.items():
+            self.emit(topic, tally.snapshot())
+
+    def stop(self):
+        """Stop the flusher thread and emit whatever is still pending."""
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        self._stopped.set()
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.window):
+            self.flush()
@@ -0,0 +1,20 @@
+from typing import Callable
+
+Listener = Callable[[str, dict], None]
+
+_listeners: list[Listener] = []
+
+def poll_topic(poll_id: int) -> str:
+    return f"poll:{poll_id}"
+
+def add_listener(listener: Listener):
+    _listeners.append(listener)
+
+def remove_listener(listener: Listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def publish(topic: str, event: dict):
+    """Hand a committed state change to every listener; listeners must not block."""
+    for listener in list(_listeners):
+        listener(topic, event)
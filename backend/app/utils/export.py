@@ -0,0 +1,55 @@
+"""Encode row batches as NDJSON or CSV text chunks for StreamingResponse.
+
+One chunk is produced per batch, so memory stays bounded by the batch size
+however many rows the export covers.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence, Union
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _ndjson_chunk(columns: Sequence[str], rows) -> str:
+    return "".join(json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n" for row in rows)
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def _header(fmt: str, columns: Sequence[str]) -> str:
+    return _csv_chunk([columns]) if fmt == "csv" else ""
+
+def _chunk(fmt: str, columns: Sequence[str], rows) -> str:
+    return _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(columns, rows)
+
+def encode_batches(fmt: str, columns: Sequence[str], batches: Iterable[Sequence]) -> Iterator[str]:
+    header = _header(fmt, columns)
+    if header:
+        yield header
+    for rows in batches:
+        yield _chunk(fmt, columns, rows)
+
+async def encode_batches_async(fmt: str, columns: Sequence[str], batches: AsyncIterable[Sequence]) -> AsyncIterator[str]:
+    header = _header(fmt, columns)
+    if header:
+        yield header
+    async for rows in batches:
+        yield _chunk(fmt, columns, rows)
+
+def export_response(fmt: str, columns: Sequence[str], batches: Union[Iterable, AsyncIterable], filename: str) -> StreamingResponse:
+    if hasattr(batches, "__aiter__"):
+        body = encode_batches_async(fmt, columns, batches)
+    else:
+        body = encode_batches(fmt, columns, batches)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
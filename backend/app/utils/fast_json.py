@@ -0,0 +1,42 @@
+"""Opt-in fast path for large list responses (FAST_JSON_RESPONSES).
+
+poll_service already shapes every row to its response schema, so re-validating
+each item through response_model only repeats work. With the setting on, list
+endpoints hand their rows straight to the encoder: orjson when the fast-json
+extra is installed, otherwise a compact stdlib json.dumps.
+"""
+import json
+from datetime import datetime
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson / poetry install -E fast-json
+    orjson = None
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def list_response(items: list, response: Response):
+    """items for FastAPI to validate as usual, or an encoded response when FAST_JSON_RESPONSES is on.
+
+    Headers already set on the endpoint's response (cursors, ETag) are carried over.
+    """
+    from ..core.config import settings
+    if not settings.FAST_JSON_RESPONSES:
+        return items
+    return FastJSONResponse(items, headers=dict(response.headers))
@@ -0,0 +1,38 @@
+"""ETag / If-None-Match handling for poll reads.
+
+Each read has its own change counter on Poll (version, results_version,
+comments_version), bumped in the transaction of every write that changes that
+read, so a matching tag can be answered with 304 before the poll, its results
+or its comments are loaded, and a vote does not invalidate the comments.
+"""
+from typing import Optional
+
+from fastapi import Request, Response
+
+def poll_etag(resource: str, poll_id: int, version: Optional[int]) -> Optional[str]:
+    if version is None:
+        return None
+    return f'"{resource}-{poll_id}-{version}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def cache_control(max_age: int) -> str:
+    # Shared caches may keep the body, but must revalidate it with the tag once stale
+    return f"public, max-age={max_age}, must-revalidate"
+
+def conditional_response(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Tag the response, or return a 304 when the client already holds this version."""
+    if etag is None:
+        return None
+    from ..core.config import settings
+    headers = {"ETag": etag, "Cache-Control": cache_control(settings.HTTP_CACHE_MAX_AGE_SECONDS)}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,102 @@
+"""Per-request timing and SQL accounting for /metrics.
+
+RequestMetricsMiddleware times every HTTP request and attaches a RequestStats
+to a context variable; SQLAlchemy cursor events (installed once for every
+Engine) add each statement's count and duration to it. The context is copied
+into threadpool workers, so sync endpoints are counted too.
+"""
+import contextvars
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import COUNT_BUCKETS, LATENCY_BUCKETS, Registry
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a failed statement leaves nothing behind
+    context._pollify_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_pollify_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+_hooks_installed = False
+
+def install_query_hooks():
+    """Count statements on every Engine (sync, and the sync core of async engines)."""
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _hooks_installed = True
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app, registry: Registry, query_warn_threshold: int = 0):
+        self.app = app
+        self.query_warn_threshold = query_warn_threshold
+        self.requests = registry.counter("pollify_http_requests_total", "HTTP requests by route and status")
+        self.latency = registry.histogram("pollify_http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS)
+        self.queries = registry.histogram("pollify_http_request_queries", "SQL statements per HTTP request", COUNT_BUCKETS)
+        self.db_time = registry.histogram("pollify_http_request_db_seconds", "Time spent in SQL per HTTP request", LATENCY_BUCKETS)
+        self.too_many_queries = registry.counter(
+            "pollify_http_request_query_threshold_exceeded_total", "Requests that issued more SQL statements than the N+1 threshold"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            self._record(scope, status, elapsed, stats)
+
+    def _record(self, scope, status: int, elapsed: float, stats: RequestStats):
+        # The route template keeps label cardinality bounded (/polls/{poll_id}, not /polls/42)
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        self.requests.inc(method=method, route=route, status=status)
+        self.latency.observe(elapsed, method=method, route=route)
+        self.queries.observe(stats.queries, method=method, route=route)
+        self.db_time.observe(stats.db_time, method=method, route=route)
+        if self.query_warn_threshold and stats.queries > self.query_warn_threshold:
+            self.too_many_queries.inc(method=method, route=route)
+            logger.warning(
+                "%s %s issued %d SQL statements (threshold %d); possible N+1 query",
+                method, route, stats.queries, self.query_warn_threshold,
+            )
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from .redis_support import import_redis
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, str], Awaitable[None]]
+
+class InMemoryBroker:
+    """Process-local broker: every publish is handed straight to the subscribed handler."""
+
+    def __init__(self):
+        self._handlers: list[Handler] = []
+
+    async def publish(self, channel: str, message: str):
+        for handler in list(self._handlers):
+            await handler(channel, message)
+
+    async def subscribe(self, handler: Handler):
+        self._handlers.append(handler)
+
+    async def close(self):
+        self._handlers.clear()
+
+class RedisBroker:
+    """Redis pub/sub broker so every replica delivers messages to its own sockets."""
+
+    def __init__(self, client, prefix: str = "pollify:"):
+        self.client = client
+        self.prefix = prefix
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        redis = import_redis("BROKER_URL", "redis.asyncio")
+        return cls(redis.from_url(url), **kwargs)
+
+    async def publish(self, channel: str, message: str):
+        await self.client.publish(self.prefix + channel, message)
+
+    async def subscribe(self, handler: Handler):
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(self.prefix + "*")
+        self._listener = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: Handler):
+        async for message in self._pubsub.listen():
+            if message["type"] != "pmessage":
+                continue
+            channel = _decode(message["channel"])[len(self.prefix):]
+            try:
+                await handler(channel, _decode(message["data"]))
+            except Exception:
+                logger.exception("Failed to deliver message on %s", channel)
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await self.client.aclose()
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+def create_broker(url: str = ""):
+    """Return a Redis broker for redis:// URLs, otherwise the in-memory default."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker.from_url(url)
+    return InMemoryBroker()
@@ -0,0 +1,92 @@
+"""Token-bucket rate limiters: one bucket of `burst` tokens per key, refilled at `rate` per second.
+
+acquire() takes a token and returns 0, or returns the seconds until one will be
+available without taking anything. TokenBucketLimiter keeps buckets in
+process; RedisTokenBucketLimiter shares them between workers and replicas.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from .redis_support import import_redis
+
+def _take(tokens: float, elapsed: float, rate: float, burst: int) -> Tuple[float, float]:
+    """Refill for the elapsed time and take one token: (tokens left, seconds to wait)."""
+    tokens = min(burst, tokens + max(elapsed, 0.0) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+class TokenBucketLimiter:
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str) -> float:
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens, wait = _take(tokens, now - updated, self.rate, self.burst)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # The least recently seen key starts over with a full bucket, which only errs towards allowing
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+class RedisTokenBucketLimiter:
+    """Buckets stored as Redis hashes, updated under WATCH so concurrent workers never double-spend a token."""
+
+    def __init__(self, client, rate: float, burst: int, prefix: str = "pollify:ratelimit:", clock: Callable[[], float] = time.time, max_retries: int = 5):
+        self.client = client
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        # Wall-clock time, so replicas agree on how much a bucket has refilled
+        self.clock = clock
+        self.max_retries = max_retries
+        # A bucket left alone this long is full again and needs no state
+        self.ttl = max(1, math.ceil(burst / rate))
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        redis = import_redis("RATE_LIMIT_URL", "redis.asyncio")
+        return cls(redis.from_url(url), **kwargs)
+
+    async def acquire(self, key: str) -> float:
+        import redis
+
+        name = self.prefix + key
+        for _ in range(self.max_retries):
+            async with self.client.pipeline() as pipe:
+                try:
+                    await pipe.watch(name)
+                    stored_tokens, stored_at = await pipe.hmget(name, "tokens", "updated")
+                    now = self.clock()
+                    if stored_tokens is None:
+                        stored_tokens, stored_at = self.burst, now
+                    tokens, wait = _take(float(stored_tokens), now - float(stored_at), self.rate, self.burst)
+                    pipe.multi()
+                    pipe.hset(name, mapping={"tokens": tokens, "updated": now})
+                    pipe.expire(name, self.ttl)
+                    await pipe.execute()
+                    return wait
+                except redis.WatchError:
+                    continue
+        # Lost every race for this key: it is being hammered, so treat it as limited
+        return 1 / self.rate
+
+def create_rate_limiter(url: str, rate: float, burst: int):
+    """Return a Redis-backed limiter for redis:// URLs, otherwise the in-process one."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTokenBucketLimiter.from_url(url, rate=rate, burst=burst)
+    return TokenBucketLimiter(rate=rate, burst=burst)
@@ -0,0 +1,11 @@
+import importlib
+
+def import_redis(setting: str, module: str = "redis"):
+    """Import the optional redis client, naming the setting that asked for it when it is missing."""
+    try:
+        return importlib.import_module(module)
+    except ImportError as exc:
+        raise RuntimeError(
+            f"{setting} is a Redis URL but the redis package is not installed; "
+            "install the redis extra (`poetry install -E redis`)"
+        ) from exc
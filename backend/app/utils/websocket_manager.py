@@ -1,17 +1,173 @@
 from fastapi import WebSocket
-from typing import List
+from typing import Callable, Dict, Optional, Set
+import asyncio
+import json
+import re
+from .pubsub import InMemoryBroker
+
+BROADCAST_CHANNEL = "broadcast"
+TOPIC_PATTERN = re.compile(r"^poll:\d+$")
+SLOW_CONSUMER_POLICIES = ("drop", "disconnect")
+
+class _Outbox:
+    """Bounded send queue drained by one task per socket, so a slow client only stalls itself."""
+
+    def __init__(self, websocket: WebSocket, maxsize: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.task: Optional[asyncio.Task] = None
+        # This socket's subscriptions, so leaving touches only its own topics
+        self.topics: Set[str] = set()
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, broker=None, queue_size: int = 100, slow_consumer_policy: str = "disconnect"):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.active_connections: Dict[WebSocket, _Outbox] = {}
+        self.subscriptions: Dict[str, Set[WebSocket]] = {}
+        self.broker = broker or InMemoryBroker()
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.stats = {"delivered": 0, "dropped": 0, "slow_disconnects": 0, "send_failures": 0}
+        self._started = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[asyncio.Future] = set()
+        self._channel_handlers: Dict[str, Callable[[str], None]] = {}
+
+    def on_channel(self, channel: str, handler: Callable[[str], None]):
+        """Hand messages on a channel to handler instead of to sockets, e.g. process-wide signals."""
+        self._channel_handlers[channel] = handler
+
+    async def start(self):
+        # Idempotent: runs from the app lifespan and again on first connect
+        self._loop = asyncio.get_running_loop()
+        if not self._started:
+            self._started = True
+            await self.broker.subscribe(self._deliver)
+
+    async def stop(self):
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+        if self._started:
+            self._started = False
+            await self.broker.close()
 
     async def connect(self, websocket: WebSocket):
+        await self.start()
         await websocket.accept()
-        self.active_connections.append(websocket)
+        outbox = _Outbox(websocket, self.queue_size)
+        outbox.task = asyncio.create_task(self._drain(outbox))
+        self.active_connections[websocket] = outbox
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        outbox = self._forget(websocket)
+        if outbox is not None and outbox.task is not None:
+            outbox.task.cancel()
+
+    def _forget(self, websocket: WebSocket) -> Optional[_Outbox]:
+        outbox = self.active_connections.pop(websocket, None)
+        if outbox is not None:
+            for topic in outbox.topics:
+                self._remove_subscriber(websocket, topic)
+            outbox.topics.clear()
+        return outbox
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        if not TOPIC_PATTERN.match(topic):
+            raise ValueError(f"Unknown topic: {topic}")
+        outbox = self.active_connections.get(websocket)
+        if outbox is None:
+            return
+        outbox.topics.add(topic)
+        self.subscriptions.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        outbox = self.active_connections.get(websocket)
+        if outbox is not None:
+            outbox.topics.discard(topic)
+        self._remove_subscriber(websocket, topic)
+
+    def _remove_subscriber(self, websocket: WebSocket, topic: str):
+        subscribers = self.subscriptions.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.subscriptions[topic]
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        # Publish once; every process (including this one) delivers to its own sockets
+        await self.broker.publish(BROADCAST_CHANNEL, json.dumps(message))
+
+    async def publish(self, topic: str, message: dict):
+        await self.broker.publish(topic, json.dumps(message))
+
+    def publish_nowait(self, topic: str, message: dict):
+        """Schedule a topic publish from sync code, including threadpool workers."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and not self._loop.is_closed() and running is not self._loop:
+            future = asyncio.run_coroutine_threadsafe(self.publish(topic, message), self._loop)
+        elif running is not None:
+            future = running.create_task(self.publish(topic, message))
+        else:
+            return
+        self._track(future)
+
+    def send_personal(self, websocket: WebSocket, message: dict):
+        outbox = self.active_connections.get(websocket)
+        if outbox is not None:
+            self._enqueue(outbox, json.dumps(message))
+
+    async def _deliver(self, channel: str, data: str):
+        # data is already serialized by the publisher; it goes out as-is to every recipient
+        handler = self._channel_handlers.get(channel)
+        if handler is not None:
+            handler(data)
+            return
+        if channel == BROADCAST_CHANNEL:
+            recipients = list(self.active_connections)
+        else:
+            recipients = list(self.subscriptions.get(channel, ()))
+        for websocket in recipients:
+            outbox = self.active_connections.get(websocket)
+            if outbox is not None:
+                self._enqueue(outbox, data)
+
+    def _enqueue(self, outbox: _Outbox, data: str):
+        try:
+            outbox.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            if self.slow_consumer_policy == "drop":
+                # Keep the newest state: discard the oldest queued message to make room
+                outbox.queue.get_nowait()
+                outbox.queue.put_nowait(data)
+                self.stats["dropped"] += 1
+                return
+            self.stats["slow_disconnects"] += 1
+            self.disconnect(outbox.websocket)
+            # 1013: try again later
+            self._track(asyncio.ensure_future(self._close_quietly(outbox.websocket, 1013)))
+
+    async def _drain(self, outbox: _Outbox):
+        while True:
+            data = await outbox.queue.get()
+            try:
+                await outbox.websocket.send_text(data)
+            except Exception:
+                # Dead socket: drop its bookkeeping without cancelling the running task
+                self.stats["send_failures"] += 1
+                self._forget(outbox.websocket)
+                return
+            self.stats["delivered"] += 1
+
+    async def _close_quietly(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _track(self, future: asyncio.Future):
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
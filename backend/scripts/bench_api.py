@@ -0,0 +1,371 @@
+"""Throughput and latency benchmark for the poll API.
+
+Usage:
+    python scripts/bench_api.py [--mode asgi|uvicorn] [--requests 500] [--concurrency 20]
+                                [--output results.json] [--baseline scripts/bench_baseline.json]
+                                [--save-baseline]
+
+Seeds users, polls and votes into a scratch SQLite database, then drives the
+real app either in-process over ASGI or through uvicorn on localhost. It
+covers the feed, results, vote and like endpoints and /ws fan-out, and
+prints p50/p95/p99 latency and requests per second as JSON. Scenarios are
+compared with a stored baseline: the run exits 1 when a p95 or a
+throughput figure is worse than the baseline by more than --tolerance.
+Baselines are machine-specific, so record one on the machine that runs the
+comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "bench_baseline.json"
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of the samples (seconds), in milliseconds."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank] * 1000
+
+
+def summarize(latencies: list, errors: int, elapsed: float, operations: int = None) -> dict:
+    operations = len(latencies) if operations is None else operations
+    return {
+        "requests": operations,
+        "errors": errors,
+        "rps": round(operations / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def seed(database_url: str, users: int, polls: int, votes: int, rng: random.Random) -> dict:
+    """Create bench users (with tokens), polls and seed votes; returns what the scenarios need."""
+    from app.db.migrations import upgrade_schema
+    from app.db.session import create_db_engine
+    from app.core.hashing import PasswordHasher
+    from app.models.poll_option import PollOption
+    from app.models.polls import Poll
+    from app.models.user import User
+    from app.models.vote import Vote
+    from app.services.auth_service import create_user_token
+    from app.services.poll_service import rebuild_option_counts
+    from sqlalchemy.orm import Session
+
+    engine = create_db_engine(database_url)
+    # Built by the migrations, so the app's startup schema check passes
+    upgrade_schema(engine)
+    # One cheap hash shared by every seeded account; the bench never logs in
+    password = PasswordHasher(rounds=4, workers=1).hash("bench")
+    with Session(engine) as db:
+        bench_users = [User(username=f"bench_{i}", password=password) for i in range(users)]
+        voters = [User(username=f"seed_voter_{i}", password=password) for i in range(max(1, votes // max(polls, 1) + 1))]
+        db.add_all(bench_users + voters)
+        db.flush()
+        bench_polls = [
+            Poll(
+                question=f"Bench poll {i}?",
+                creator_id=rng.choice(bench_users).id,
+                options=[PollOption(position=p, label=f"Option {p}") for p in range(4)],
+            )
+            for i in range(polls)
+        ]
+        db.add_all(bench_polls)
+        db.flush()
+        # Seed voters each vote once per poll until `votes` rows exist
+        rows = []
+        for n in range(votes):
+            poll = bench_polls[n % polls]
+            rows.append({"poll_id": poll.id, "option_id": rng.choice(poll.options).id, "user_id": voters[n // polls].id})
+        if rows:
+            db.execute(Vote.__table__.insert(), rows)
+        db.commit()
+        rebuild_option_counts(db)
+        fixture = {
+            "tokens": [create_user_token(user.username, user.id) for user in bench_users],
+            "poll_ids": [poll.id for poll in bench_polls],
+        }
+    engine.dispose()
+    return fixture
+
+
+class AsgiWebSocket:
+    """Minimal in-process WebSocket client speaking the ASGI protocol to the app."""
+
+    def __init__(self, app, path: str):
+        self._incoming = asyncio.Queue()
+        self._outgoing = asyncio.Queue()
+        scope = {"type": "websocket", "path": path, "raw_path": path.encode(), "query_string": b"",
+                 "headers": [], "scheme": "ws", "server": ("bench", 80), "client": ("bench", 1),
+                 "subprotocols": [], "asgi": {"version": "3.0"}}
+        self._task = asyncio.create_task(app(scope, self._incoming.get, self._outgoing.put))
+
+    async def connect(self):
+        await self._incoming.put({"type": "websocket.connect"})
+        message = await self._outgoing.get()
+        assert message["type"] == "websocket.accept", message
+
+    async def send(self, text: str):
+        await self._incoming.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str:
+        while True:
+            message = await self._outgoing.get()
+            if message["type"] == "websocket.send":
+                return message["text"]
+
+    async def close(self):
+        await self._incoming.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=1)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class Target:
+    """Where requests go: the app in-process over ASGI, or uvicorn on localhost."""
+
+    def __init__(self, mode: str, database_url: str, workers: int = 1):
+        self.mode = mode
+        self.database_url = database_url
+        self.workers = workers
+        self.server = None
+        self.app = None
+        self._lifespan = None
+
+    async def __aenter__(self):
+        import httpx
+
+        if self.mode == "asgi":
+            from app.main import app
+
+            self.app = app
+            self._lifespan = app.router.lifespan_context(app)
+            await self._lifespan.__aenter__()
+            transport = httpx.ASGITransport(app=app)
+            self.client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+        else:
+            port = _free_port()
+            self.base_url = f"http://127.0.0.1:{port}"
+            self.server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(self.workers), "--log-level", "warning"],
+                cwd=BACKEND_DIR,
+                env={**os.environ, "DATABASE_URL": self.database_url},
+            )
+            limits = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+            self.client = httpx.AsyncClient(base_url=self.base_url, limits=limits)
+            await self._wait_until_up()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        if self._lifespan is not None:
+            await self._lifespan.__aexit__(None, None, None)
+        if self.server is not None:
+            self.server.terminate()
+            self.server.wait(timeout=10)
+
+    async def _wait_until_up(self):
+        for _ in range(100):
+            try:
+                await self.client.get("/")
+                return
+            except Exception:
+                await asyncio.sleep(0.1)
+        raise RuntimeError("uvicorn did not start")
+
+    async def websocket(self):
+        if self.mode == "asgi":
+            ws = AsgiWebSocket(self.app, "/ws")
+            await ws.connect()
+            return ws
+        import websockets
+
+        return await websockets.connect(self.base_url.replace("http", "ws") + "/ws", max_queue=None)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(make_request, total: int, concurrency: int) -> dict:
+    """Issue `total` requests from `concurrency` workers and summarize their latencies."""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(i)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_ws_fanout(target: Target, fixture: dict, subscribers: int, rounds: int) -> dict:
+    """Latency from a committed vote to its tally arriving at every subscriber of the poll."""
+    poll_id = fixture["poll_ids"][0]
+    sockets = []
+    for _ in range(subscribers):
+        ws = await target.websocket()
+        await ws.send(json.dumps({"action": "subscribe", "topic": f"poll:{poll_id}"}))
+        assert json.loads(await ws.recv())["type"] == "subscribed"
+        sockets.append(ws)
+
+    async def received_at(ws):
+        await ws.recv()
+        return time.perf_counter()
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for n in range(rounds):
+        headers = {"Authorization": f"Bearer {fixture['tokens'][-(n + 1)]}"}
+        sent = time.perf_counter()
+        response = await target.client.post(f"/api/v1/polls/{poll_id}/like", headers=headers)
+        errors += response.status_code >= 400
+        try:
+            arrivals = await asyncio.wait_for(asyncio.gather(*(received_at(ws) for ws in sockets)), timeout=5)
+        except asyncio.TimeoutError:
+            errors += subscribers
+            continue
+        latencies.extend(arrival - sent for arrival in arrivals)
+    elapsed = time.perf_counter() - start
+    for ws in sockets:
+        await ws.close()
+    return summarize(latencies, errors, elapsed, operations=len(latencies))
+
+
+async def run_suite(args, fixture: dict, database_url: str) -> dict:
+    rng = random.Random(args.seed)
+    tokens, poll_ids = fixture["tokens"], fixture["poll_ids"]
+    users = len(tokens)
+
+    def auth(i):
+        return {"Authorization": f"Bearer {tokens[i % users]}"}
+
+    async with Target(args.mode, database_url, args.workers) as target:
+        client = target.client
+        scenarios = {
+            "list_polls": lambda i: client.get("/api/v1/polls/", params={"limit": 20}),
+            "poll_results": lambda i: client.get(f"/api/v1/polls/{rng.choice(poll_ids)}/results"),
+            # user i % users votes on poll i // users: every vote is a first vote
+            "vote": lambda i: client.post(
+                f"/api/v1/polls/{poll_ids[(i // users) % len(poll_ids)]}/vote", json={"option": "Option 1"}, headers=auth(i)
+            ),
+            "like": lambda i: client.post(f"/api/v1/polls/{rng.choice(poll_ids)}/like", headers=auth(i)),
+        }
+        results = {}
+        for name, make_request in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            if name != "vote":  # warming up would use up first votes
+                await run_load(make_request, min(args.warmup, args.requests), args.concurrency)
+            results[name] = await run_load(make_request, args.requests, args.concurrency)
+        if not args.only or "ws_fanout" in args.only:
+            results["ws_fanout"] = await run_ws_fanout(target, fixture, args.ws_subscribers, args.ws_rounds)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose p95 or throughput is worse than the baseline by more than tolerance."""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            continue
+        if reference["p95_ms"] and current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append({"scenario": name, "metric": "p95_ms", "baseline": reference["p95_ms"], "current": current["p95_ms"]})
+        if reference["rps"] and current["rps"] < reference["rps"] * (1 - tolerance):
+            regressions.append({"scenario": name, "metric": "rps", "baseline": reference["rps"], "current": current["rps"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--votes", type=int, default=2000, help="votes seeded before the run")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before each read scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--ws-subscribers", type=int, default=50)
+    parser.add_argument("--ws-rounds", type=int, default=20)
+    parser.add_argument("--only", nargs="*", help="scenarios to run (list_polls poll_results vote like ws_fanout)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+    if args.requests > args.users * args.polls:
+        parser.error("--requests must not exceed --users * --polls (every vote must be a first vote)")
+
+    scratch = tempfile.TemporaryDirectory(prefix="pollify-bench-")
+    database_url = f"sqlite:///{scratch.name}/bench.db"
+    # The app builds its engine from the environment at import time
+    os.environ["DATABASE_URL"] = database_url
+    # Measure the endpoints, not the per-user write limit
+    os.environ.setdefault("RATE_LIMIT_PER_SECOND", "0")
+
+    fixture = seed(database_url, args.users, args.polls, args.votes, random.Random(args.seed))
+    results = asyncio.run(run_suite(args, fixture, database_url))
+
+    report = {
+        "meta": {
+            "mode": args.mode,
+            "workers": args.workers,
+            "users": args.users,
+            "polls": args.polls,
+            "seed_votes": args.votes,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "ws_subscribers": args.ws_subscribers,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.save_baseline:
+        report["regressions"] = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    if args.save_baseline:
+        baseline_path.write_text(text + "\n")
+    scratch.cleanup()
+    sys.exit(1 if report.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
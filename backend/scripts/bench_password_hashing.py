@@ -0,0 +1,47 @@
+"""Measure password verification throughput, i.e. the login capacity of one process.
+
+Usage: python scripts/bench_password_hashing.py [--rounds 12] [--workers N] [--logins 64]
+
+Each login is one bcrypt verify on the PasswordHasher pool. The pool is sized
+1..N workers so the report shows how throughput scales with cores.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from app.core.hashing import PasswordHasher
+
+
+def measure(rounds: int, workers: int, logins: int) -> float:
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=logins)
+    hashed = hasher.hash("correct horse battery staple")
+    # Callers stand in for request threads; the hasher's pool does the work
+    with ThreadPoolExecutor(max_workers=logins) as callers:
+        start = time.perf_counter()
+        results = list(callers.map(lambda _: hasher.verify("correct horse battery staple", hashed), range(logins)))
+        elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (PASSWORD_BCRYPT_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest pool size to try")
+    parser.add_argument("--logins", type=int, default=64, help="verifications per measurement")
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds={args.rounds}, {args.logins} logins per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'logins/s':>10} {'per core':>10}")
+    for workers in range(1, args.workers + 1):
+        rate = measure(args.rounds, workers, args.logins)
+        cores = min(workers, os.cpu_count() or 1)
+        print(f"{workers:>8} {rate:>10.1f} {rate / cores:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure the cost of serializing poll and comment lists, per 1000 items.
+
+Usage: python scripts/bench_serialization.py [--items 1000] [--repeat 50]
+
+"validated" is what FastAPI does for response_model=list[...]: validate every
+item, dump it in JSON mode, then json.dumps the result. "fast (json)" and
+"fast (orjson)" are the FAST_JSON_RESPONSES path, which encodes the rows
+poll_service already shaped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.schemas import poll_schema
+from app.utils import fast_json
+
+
+def poll_rows(count: int) -> list:
+    return [
+        {"id": i, "question": f"Question number {i}?", "options": ["Yes", "No", "Maybe", f"Option {i}"], "likes": i % 97, "username": f"user{i % 50}"}
+        for i in range(count)
+    ]
+
+
+def comment_rows(count: int) -> list:
+    start = datetime(2025, 1, 1, 12, 0)
+    return [
+        {"id": i, "content": f"Comment {i} with a little text in it", "user_id": i % 50, "username": f"user{i % 50}", "created_at": start + timedelta(seconds=i, microseconds=i)}
+        for i in range(count)
+    ]
+
+
+def validated(field):
+    async def encode(items):
+        content = await serialize_response(field=field, response_content=items)
+        return JSONResponse(content).body
+    return encode
+
+
+def fast_stdlib(items):
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":"), default=fast_json._default).encode()
+
+
+async def timed(encode, items, repeat: int) -> float:
+    # Everything runs inside one event loop, so the async baseline pays no loop setup per call
+    async def call():
+        result = encode(items)
+        if asyncio.iscoroutine(result):
+            await result
+
+    await call()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000, help="items per response")
+    parser.add_argument("--repeat", type=int, default=50, help="responses per measurement")
+    args = parser.parse_args()
+
+    encoders = [("validated", None), ("fast (json)", fast_stdlib)]
+    if fast_json.orjson is not None:
+        encoders.append(("fast (orjson)", fast_json.orjson.dumps))
+
+    scale = 1000 / args.items * 1000
+    print(f"{args.items} items per response, {args.repeat} responses, ms per 1k items")
+    print(f"{'payload':<10} {'encoder':<15} {'ms/1k':>8} {'speedup':>8}")
+    for name, rows, schema in (("polls", poll_rows, poll_schema.Poll), ("comments", comment_rows, poll_schema.Comment)):
+        items = rows(args.items)
+        field = create_model_field(name="Response", type_=list[schema], mode="serialization")
+        baseline = None
+        for label, encode in encoders:
+            seconds = asyncio.run(timed(encode or validated(field), items, args.repeat))
+            baseline = baseline or seconds
+            print(f"{name:<10} {label:<15} {seconds * scale:>8.2f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Recompute poll_option_counts from the votes table.
+
+Usage: python scripts/rebuild_counts.py [poll_id]
+"""
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db import base  # noqa: F401 - register all models
+from app.services import poll_cache
+from app.services.poll_service import rebuild_option_counts
+from app.utils.pubsub import create_broker
+
+
+async def broadcast(poll_id):
+    broker = create_broker(settings.BROKER_URL)
+    try:
+        await poll_cache.broadcast_invalidation(broker, poll_id)
+    finally:
+        await broker.close()
+
+
+def invalidate_caches(poll_id):
+    """Drop the rebuilt polls from the caches of the running workers."""
+    if settings.CACHE_TTL_SECONDS <= 0:
+        return
+    if settings.CACHE_URL:
+        # Shared by every worker, so dropping the entries here is enough
+        if poll_id is not None:
+            poll_cache.invalidate_poll(poll_id)
+        else:
+            poll_cache.invalidate_all()
+    elif settings.BROKER_URL:
+        # Workers keep their own caches and relay invalidations over the broker
+        asyncio.run(broadcast(poll_id))
+    else:
+        print(
+            "Warning: neither CACHE_URL nor BROKER_URL is set, so running workers "
+            f"serve the old counts from their caches for up to {settings.CACHE_TTL_SECONDS:g}s",
+            file=sys.stderr,
+        )
+
+
+def main():
+    poll_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    db = SessionLocal()
+    try:
+        rows = rebuild_option_counts(db, poll_id)
+    finally:
+        db.close()
+    invalidate_caches(poll_id)
+    target = f"poll {poll_id}" if poll_id is not None else "all polls"
+    print(f"Rebuilt {rows} option tallies for {target}")
+
+
+if __name__ == "__main__":
+    main()
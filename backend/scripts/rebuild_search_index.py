@@ -0,0 +1,24 @@
+"""Re-index every poll in the poll_search full-text table.
+
+Usage: python scripts/rebuild_search_index.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from app.db.session import SessionLocal
+from app.db import base  # noqa: F401 - register all models
+from app.services.poll_service import rebuild_search_index
+
+
+def main():
+    db = SessionLocal()
+    try:
+        rebuild_search_index(db)
+    finally:
+        db.close()
+    print("Rebuilt the poll search index")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 "use client";
 
 import { useState, useEffect } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { PollCard } from "@/components/features/polls/poll-card";
 import { CreatePollDialog } from "@/components/features/polls/create-poll-dialog";
 import { Button } from "@/components/ui/button";
@@ -18,6 +18,7 @@ import {
 import { useRouter } from "next/navigation";
 import DelayedLoader from "@/components/shared/DelayedLoader"
 import { API_BASE_URL } from "@/lib/api/endpoints";
+import { fetchCursorPage } from "@/lib/api/pagination";
 
 interface Poll {
   id: number;
@@ -72,12 +73,22 @@ export default function Dashboard() {
     }
   }, [router]);
 
-  const { data: polls = [], isLoading: isPollsLoading } = useQuery({
+  const {
+    data,
+    isLoading: isPollsLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["polls"],
-    queryFn: () => fetch(`${API_BASE_URL}/polls/`).then((res) => res.json()),
+    queryFn: ({ pageParam }) =>
+      fetchCursorPage<Poll>(`${API_BASE_URL}/polls/`, "cursor", pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     refetchInterval: 10000,
     enabled: !!user,
   });
+  const polls = data?.pages.flatMap((page) => page.items) ?? [];
 
   const handlePollCreated = () => {
     setIsCreateOpen(false);
@@ -168,11 +179,25 @@ export default function Dashboard() {
             </Button>
           </div>
         ) : (
-          <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-3">
-            {polls.map((poll: Poll) => (
-              <PollCard key={poll.id} poll={poll} />
-            ))}
-          </div>
+          <>
+            <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-3">
+              {polls.map((poll: Poll) => (
+                <PollCard key={poll.id} poll={poll} />
+              ))}
+            </div>
+            {hasNextPage && (
+              <div className="mt-8 flex justify-center">
+                <Button
+                  variant="outline"
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                  className="hover:cursor-pointer"
+                >
+                  {isFetchingNextPage ? "Loading..." : "Load more"}
+                </Button>
+              </div>
+            )}
+          </>
         )}
       </main>
 
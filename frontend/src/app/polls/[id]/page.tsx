@@ -3,7 +3,8 @@
 import { useState, use } from "react"
 import DelayedLoader from "@/components/shared/DelayedLoader"
 import { API_BASE_URL } from "@/lib/api/endpoints"
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query"
+import { fetchCursorPage } from "@/lib/api/pagination"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import Link from "next/link"
@@ -40,10 +41,19 @@ export default function PollDetail({ params }: { params: Promise<{ id: string }>
     queryFn: () => fetch(`${API_BASE_URL}/polls/${id}/results`).then(res => res.json())
   })
   
-  const { data: comments = [] } = useQuery({
+  // Newest first; X-Next-Cursor goes back as `before` for older comments
+  const {
+    data: commentPages,
+    hasNextPage: hasOlderComments,
+    fetchNextPage: fetchOlderComments,
+    isFetchingNextPage: isFetchingOlderComments
+  } = useInfiniteQuery({
     queryKey: ['poll-comments', id],
-    queryFn: () => fetch(`${API_BASE_URL}/polls/${id}/comments`).then(res => res.json())
+    queryFn: ({ pageParam }) => fetchCursorPage<any>(`${API_BASE_URL}/polls/${id}/comments`, "before", pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor
   })
+  const comments = commentPages?.pages.flatMap(page => page.items) ?? []
   
   const voteMutation = useMutation({
     mutationFn: (option: string) => {
@@ -149,7 +159,7 @@ export default function PollDetail({ params }: { params: Promise<{ id: string }>
           
           {/* Comments Section */}
           <div className="space-y-4">
-            <h2 className="text-xl font-semibold">Comments ({comments.length})</h2>
+            <h2 className="text-xl font-semibold">Comments ({comments.length}{hasOlderComments ? "+" : ""})</h2>
             
             <form onSubmit={(e) => {
               e.preventDefault()
@@ -179,6 +189,16 @@ export default function PollDetail({ params }: { params: Promise<{ id: string }>
                   No comments yet. Be the first!
                 </p>
               )}
+              {hasOlderComments && (
+                <Button
+                  variant="ghost"
+                  className="w-full"
+                  onClick={() => fetchOlderComments()}
+                  disabled={isFetchingOlderComments}
+                >
+                  {isFetchingOlderComments ? "Loading..." : "Load older comments"}
+                </Button>
+              )}
             </div>
           </div>
         </div>
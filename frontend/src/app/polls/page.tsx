@@ -1,8 +1,9 @@
 "use client"
 
-import { useQuery } from "@tanstack/react-query"
+import { useInfiniteQuery } from "@tanstack/react-query"
 import DelayedLoader from "@/components/shared/DelayedLoader"
 import { API_BASE_URL } from "@/lib/api/endpoints"
+import { fetchCursorPage } from "@/lib/api/pagination"
 import { Button } from "@/components/ui/button"
 import Link from "next/link"
 interface Poll {
@@ -12,10 +13,13 @@ interface Poll {
   likes: number
 }
 export default function PollsList() {
-  const { data: polls = [], isLoading } = useQuery({
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey: ['polls'],
-    queryFn: () => fetch(`${API_BASE_URL}/polls/`).then(res => res.json())
+    queryFn: ({ pageParam }) => fetchCursorPage<Poll>(`${API_BASE_URL}/polls/`, "cursor", pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor
   })
+  const polls = data?.pages.flatMap(page => page.items) ?? []
   if (isLoading) return <DelayedLoader loading={true} />
   return (
     <div className="min-h-screen bg-background">
@@ -36,6 +40,13 @@ export default function PollsList() {
             </Link>
           ))}
         </div>
+        {hasNextPage && (
+          <div className="flex justify-center mt-8">
+            <Button variant="outline" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+              {isFetchingNextPage ? "Loading..." : "Load more"}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   )
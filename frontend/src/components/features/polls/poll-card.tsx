@@ -7,6 +7,7 @@ import { Card, CardContent, CardHeader } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Heart, MessageCircle } from "lucide-react"
 import { LikesModal } from "@/components/features/polls/likes-modal"
+import { fetchCursorPage } from "@/lib/api/pagination"
 import Link from "next/link"
 
 interface Poll {
@@ -30,9 +31,10 @@ export function PollCard({ poll }: PollCardProps) {
     queryFn: () => fetch(`${API_BASE_URL}/polls/${poll.id}/results`).then(res => res.json())
   })
   
-  const { data: comments = [] } = useQuery({
-    queryKey: ['poll-comments', poll.id],
-    queryFn: () => fetch(`${API_BASE_URL}/polls/${poll.id}/comments`).then(res => res.json())
+  // Only the newest page; a cursor means there are older comments than it holds
+  const { data: comments = { items: [], nextCursor: null } } = useQuery({
+    queryKey: ['poll-comments', poll.id, 'latest'],
+    queryFn: () => fetchCursorPage(`${API_BASE_URL}/polls/${poll.id}/comments`, "before")
   })
   
   const { data: likeStatus } = useQuery({
@@ -142,7 +144,7 @@ export function PollCard({ poll }: PollCardProps) {
           <Link href={`/polls/${poll.id}`} className="flex-1">
             <Button variant="ghost" size="sm" className="w-full gap-2 text-muted-foreground hover:text-foreground">
               <MessageCircle className="h-4 w-4" />
-              <span className="text-xs">{comments.length}</span>
+              <span className="text-xs">{comments.items.length}{comments.nextCursor ? "+" : ""}</span>
             </Button>
           </Link>
         </div>
@@ -0,0 +1,18 @@
+// List endpoints return one page as a JSON array and put the cursor for the
+// next page in the X-Next-Cursor header; no header means this was the last page
+export interface CursorPage<T> {
+  items: T[]
+  nextCursor: string | null
+}
+
+export async function fetchCursorPage<T>(
+  url: string,
+  cursorParam: string,
+  cursor?: string | null
+): Promise<CursorPage<T>> {
+  const target = cursor
+    ? `${url}${url.includes("?") ? "&" : "?"}${cursorParam}=${encodeURIComponent(cursor)}`
+    : url
+  const res = await fetch(target)
+  return { items: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") }
+}
@@ -3,6 +3,7 @@
 # Start backend
 echo "Starting backend..."
 cd backend
+alembic upgrade head
 python3 main.py &
 BACKEND_PID=$!
 
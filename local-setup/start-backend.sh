@@ -1,3 +1,4 @@
 #!/bin/bash
 cd backend
+alembic upgrade head
 uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload